@@ -5,6 +5,7 @@ import json
 import math
 import os
 import sys
+from functools import cached_property, lru_cache
 from typing import Dict, Optional
 
 try:
@@ -14,10 +15,24 @@ except Exception:
     ImageDraw = None
     ImageFont = None
 
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 
 def _require_pillow():
     if Image is None or ImageDraw is None or ImageFont is None:
-        print("error: Pillow is required. Install with: python3 -m pip install pillow", file=sys.stderr)
+        print(
+            "error: Pillow is required. Install with: python3 -m pip install pillow "
+            "(or pillow-simd, a faster drop-in build on AVX2 machines)",
+            file=sys.stderr,
+        )
         sys.exit(2)
 
 
@@ -52,7 +67,20 @@ Notes:
 """
 
 
+@lru_cache(maxsize=256)
+def _parse_color_cached(value: str):
+    return _parse_color_uncached(value)
+
+
 def _parse_color(value: str):
+    if not value:
+        return None
+    if isinstance(value, str):
+        return _parse_color_cached(value)
+    return _parse_color_uncached(value)
+
+
+def _parse_color_uncached(value: str):
     if not value:
         return None
     val = value.strip()
@@ -84,7 +112,19 @@ def _parse_color(value: str):
     raise ValueError(f"unsupported color format: {value}")
 
 
+@lru_cache(maxsize=64)
+def _load_font_cached(font_name: Optional[str], size: int):
+    return _load_font_uncached(font_name, size)
+
+
 def _load_font(font_name: Optional[str], size: int):
+    # Spec values come from JSON, so only str/None names are safe cache keys.
+    if font_name is None or isinstance(font_name, str):
+        return _load_font_cached(font_name, size)
+    return _load_font_uncached(font_name, size)
+
+
+def _load_font_uncached(font_name: Optional[str], size: int):
     if font_name:
         try:
             return ImageFont.truetype(font_name, size=size)
@@ -134,9 +174,7 @@ def _resolve_scale(defaults: Optional[dict], image_size) -> float:
 def _merge_defaults(defaults: Optional[dict], ann: dict) -> dict:
     if not defaults:
         return ann
-    merged = dict(defaults)
-    merged.update(ann)
-    return merged
+    return {**defaults, **ann}
 
 
 def _clamp(value: int, min_value: int, max_value: int) -> int:
@@ -180,64 +218,147 @@ def _parse_region(region, ann: dict, image_size):
         h = float(h)
     except Exception:
         return (0, 0, width, height)
-    x0 = _clamp(int(round(x)), 0, width)
-    y0 = _clamp(int(round(y)), 0, height)
-    x1 = _clamp(int(round(x + w)), 0, width)
-    y1 = _clamp(int(round(y + h)), 0, height)
+    # Clamp inline: rounded values are ints, so min/max need no helper call.
+    x0 = max(0, min(width, round(x)))
+    y0 = max(0, min(height, round(y)))
+    x1 = max(0, min(width, round(x + w)))
+    y1 = max(0, min(height, round(y + h)))
     if x1 <= x0 or y1 <= y0:
         return (0, 0, width, height)
     return (x0, y0, x1, y1)
 
 
-def _fit_bbox_luma(image_rgb: Image.Image, region, threshold: float, target: str, min_pixels: int):
-    pixels = image_rgb.load()
+def _mask_bbox(mask, x0: int, y0: int, min_pixels: int):
+    count = int(np.count_nonzero(mask))
+    if count < max(1, min_pixels):
+        return None
+    rows = np.any(mask, axis=1)
+    cols = np.any(mask, axis=0)
+    miny = y0 + int(np.argmax(rows))
+    maxy = y0 + len(rows) - 1 - int(np.argmax(rows[::-1]))
+    minx = x0 + int(np.argmax(cols))
+    maxx = x0 + len(cols) - 1 - int(np.argmax(cols[::-1]))
+    return (minx, miny, maxx, maxy)
+
+
+class FitPlanes:
+    # NumPy views of the source image shared by every auto-fit in a run. Both
+    # planes are built on first use, so runs without fits never pay for them,
+    # and later luma fits only slice and compare.
+    def __init__(self, image_rgb: Image.Image):
+        self._image = image_rgb
+
+    @cached_property
+    def rgb(self):
+        return np.asarray(self._image, dtype=np.uint8)
+
+    @cached_property
+    def luma(self):
+        # Accumulate one channel at a time (same order as the pure-Python path) so
+        # only the plane and one scratch buffer are allocated, never an (H, W, 3)
+        # float copy.
+        rgb = self.rgb
+        luma = np.multiply(rgb[..., 0], 0.2126, dtype=np.float64)
+        tmp = np.multiply(rgb[..., 1], 0.7152, dtype=np.float64)
+        luma += tmp
+        np.multiply(rgb[..., 2], 0.0722, out=tmp, dtype=np.float64)
+        luma += tmp
+        return luma
+
+
+def _fit_bbox_luma(image_rgb: Image.Image, region, threshold: float, target: str, min_pixels: int, planes=None):
     x0, y0, x1, y1 = region
+    if np is not None:
+        if planes is None:
+            planes = FitPlanes(image_rgb)
+        luma = planes.luma[y0:y1, x0:x1]
+        mask = (luma >= threshold) if target == "light" else (luma <= threshold)
+        return _mask_bbox(mask, x0, y0, min_pixels)
+    # Pure-Python fallback: walk raw row bytes instead of PixelAccess tuples and
+    # fold the dark/light choice into a sign so the inner test is one compare.
+    data = image_rgb.crop(region).tobytes()
+    stride = (x1 - x0) * 3
+    xs = range(x0, x1)
+    sign = -1.0 if target == "light" else 1.0
+    limit = threshold * sign
     minx = miny = 10**9
     maxx = maxy = -1
     count = 0
-    dark = target != "light"
     for y in range(y0, y1):
-        for x in range(x0, x1):
-            r, g, b = pixels[x, y]
-            luma = 0.2126 * r + 0.7152 * g + 0.0722 * b
-            if (luma <= threshold) if dark else (luma >= threshold):
+        start = (y - y0) * stride
+        row = data[start : start + stride]
+        first = last = -1
+        for x, r, g, b in zip(xs, row[0::3], row[1::3], row[2::3]):
+            if (0.2126 * r + 0.7152 * g + 0.0722 * b) * sign <= limit:
+                if first < 0:
+                    first = x
+                last = x
                 count += 1
-                if x < minx:
-                    minx = x
-                if y < miny:
-                    miny = y
-                if x > maxx:
-                    maxx = x
-                if y > maxy:
-                    maxy = y
+        if first >= 0:
+            if maxy < 0:
+                miny = y
+            maxy = y
+            if first < minx:
+                minx = first
+            if last > maxx:
+                maxx = last
     if count < max(1, min_pixels) or maxx < 0:
         return None
     return (minx, miny, maxx, maxy)
 
 
-def _fit_bbox_color(image_rgb: Image.Image, region, color, tolerance: float, min_pixels: int):
+def _fit_bbox_color(image_rgb: Image.Image, region, color, tolerance: float, min_pixels: int, planes=None):
     if not color:
         return None
-    pixels = image_rgb.load()
     x0, y0, x1, y1 = region
+    r0, g0, b0, _ = color
+    tol = max(0.0, float(tolerance))
+    if np is not None:
+        if planes is None:
+            planes = FitPlanes(image_rgb)
+        arr = planes.rgb[y0:y1, x0:x1].astype(np.int16)
+        target = np.array([r0, g0, b0], dtype=np.int16)
+        mask = np.abs(arr - target).max(axis=2) <= tol
+        return _mask_bbox(mask, x0, y0, min_pixels)
+    data = image_rgb.crop(region).tobytes()
+    stride = (x1 - x0) * 3
+    xs = range(x0, x1)
     minx = miny = 10**9
     maxx = maxy = -1
     count = 0
-    r0, g0, b0, _ = color
-    tol = max(0.0, float(tolerance))
     for y in range(y0, y1):
-        for x in range(x0, x1):
-            r, g, b = pixels[x, y]
-            if max(abs(r - r0), abs(g - g0), abs(b - b0)) <= tol:
-                count += 1
-                if x < minx:
-                    minx = x
-                if y < miny:
-                    miny = y
-                if x > maxx:
-                    maxx = x
-                if y > maxy:
-                    maxy = y
+        start = (y - y0) * stride
+        row = data[start : start + stride]
+        first = last = -1
+        for x, r, g, b in zip(xs, row[0::3], row[1::3], row[2::3]):
+            # Early-exit per channel: most misses are rejected before blue.
+            d = r - r0
+            if d < 0:
+                d = -d
+            if d > tol:
+                continue
+            d = g - g0
+            if d < 0:
+                d = -d
+            if d > tol:
+                continue
+            d = b - b0
+            if d < 0:
+                d = -d
+            if d > tol:
+                continue
+            if first < 0:
+                first = x
+            last = x
+            count += 1
+        if first >= 0:
+            if maxy < 0:
+                miny = y
+            maxy = y
+            if first < minx:
+                minx = first
+            if last > maxx:
+                maxx = last
     if count < max(1, min_pixels) or maxx < 0:
         return None
     return (minx, miny, maxx, maxy)
@@ -481,7 +602,7 @@ def _resolve_fit_config(ann: dict, defaults: Optional[dict]):
     return config
 
 
-def _apply_fit(ann: dict, image_rgb: Image.Image, defaults: Optional[dict]) -> dict:
+def _apply_fit(ann: dict, image_rgb: Image.Image, defaults: Optional[dict], planes=None) -> dict:
     fit = _normalize_fit(_resolve_fit_config(ann, defaults))
     if not fit:
         return ann
@@ -493,12 +614,12 @@ def _apply_fit(ann: dict, image_rgb: Image.Image, defaults: Optional[dict]) -> d
     if mode == "luma":
         threshold = float(fit.get("threshold", 160))
         target = str(fit.get("target", "dark")).lower()
-        bbox = _fit_bbox_luma(image_rgb, region, threshold, target, min_pixels)
+        bbox = _fit_bbox_luma(image_rgb, region, threshold, target, min_pixels, planes)
     elif mode == "color":
         color_value = fit.get("color") or fit.get("target_color")
         color = _parse_color(color_value) if color_value else None
         tolerance = float(fit.get("tolerance", 18))
-        bbox = _fit_bbox_color(image_rgb, region, color, tolerance, min_pixels)
+        bbox = _fit_bbox_color(image_rgb, region, color, tolerance, min_pixels, planes)
     else:
         return ann
     pad = float(fit.get("pad", 0))
@@ -550,12 +671,10 @@ def _resolve_dim_color(ann: dict, defaults: Optional[dict]):
     return _apply_opacity(color, opacity)
 
 
-def _draw_spotlight(overlay: Image.Image, ann: dict, scale: float, defaults: Optional[dict]):
+def _draw_spotlight(masks: dict, size, ann: dict, scale: float, defaults: Optional[dict]):
     color = _resolve_dim_color(ann, defaults)
     if not color:
-        return overlay
-    layer = Image.new("RGBA", overlay.size, color)
-    draw = ImageDraw.Draw(layer)
+        return
     padding = float(ann.get("padding", defaults.get("dim_padding", 0) if defaults else 0))
     padding = padding * scale if padding else 0.0
     radius = float(ann.get("radius", defaults.get("dim_radius", 0) if defaults else 0))
@@ -565,11 +684,24 @@ def _draw_spotlight(overlay: Image.Image, ann: dict, scale: float, defaults: Opt
     w = float(ann.get("w", 0)) + padding * 2
     h = float(ann.get("h", 0)) + padding * 2
     rect = [x, y, x + w, y + h]
+    mask = masks.get(color)
+    if mask is None:
+        mask = masks[color] = Image.new("L", size, color[3])
+    draw = ImageDraw.Draw(mask)
     if radius > 0:
-        draw.rounded_rectangle(rect, radius=radius, fill=(0, 0, 0, 0))
+        draw.rounded_rectangle(rect, radius=radius, fill=0)
     else:
-        draw.rectangle(rect, fill=(0, 0, 0, 0))
-    return Image.alpha_composite(overlay, layer)
+        draw.rectangle(rect, fill=0)
+
+
+def _composite_spotlights(overlay: Image.Image, masks: dict) -> Image.Image:
+    # One dim layer per distinct color, with every cutout for that color
+    # punched into its alpha, so N spotlights cost one composite per color.
+    for color, mask in masks.items():
+        layer = Image.new("RGBA", overlay.size, color)
+        layer.putalpha(mask)
+        overlay = Image.alpha_composite(overlay, layer)
+    return overlay
 
 
 def _draw_rect(draw: ImageDraw.ImageDraw, ann: dict, scale: float):
@@ -601,21 +733,23 @@ def _draw_arrow_primitive(
     y1: float,
     x2: float,
     y2: float,
+    cos_a: float,
+    sin_a: float,
     color,
     width: int,
     head_len: float,
     head_width: float,
 ):
-    angle = math.atan2(y2 - y1, x2 - x1)
-    back_x = x2 - head_len * math.cos(angle)
-    back_y = y2 - head_len * math.sin(angle)
+    back_x = x2 - head_len * cos_a
+    back_y = y2 - head_len * sin_a
 
-    left_angle = angle + math.pi / 2
-    right_angle = angle - math.pi / 2
-    left_x = back_x + (head_width / 2) * math.cos(left_angle)
-    left_y = back_y + (head_width / 2) * math.sin(left_angle)
-    right_x = back_x + (head_width / 2) * math.cos(right_angle)
-    right_y = back_y + (head_width / 2) * math.sin(right_angle)
+    # Head corners sit perpendicular to the shaft: rotating (cos, sin) by
+    # +/-90 degrees is (-sin, cos) / (sin, -cos), so no extra trig is needed.
+    half = head_width / 2
+    left_x = back_x - half * sin_a
+    left_y = back_y + half * cos_a
+    right_x = back_x + half * sin_a
+    right_y = back_y - half * cos_a
 
     draw.line([x1, y1, back_x, back_y], fill=color, width=width)
     draw.polygon([(x2, y2), (left_x, left_y), (right_x, right_y)], fill=color)
@@ -630,6 +764,9 @@ def _draw_arrow(draw: ImageDraw.ImageDraw, ann: dict, scale: float):
     width = int(ann.get("width", _scale_default(3, scale, minimum=2)))
     head_len = float(ann.get("head_len", _scale_default(12, scale, minimum=6)))
     head_width = float(ann.get("head_width", _scale_default(8, scale, minimum=5)))
+    angle = math.atan2(y2 - y1, x2 - x1)
+    cos_a = math.cos(angle)
+    sin_a = math.sin(angle)
 
     outline_enabled = ann.get("outline", True)
     outline_width = int(ann.get("outline_width", max(2, round(width * 0.6))))
@@ -641,33 +778,15 @@ def _draw_arrow(draw: ImageDraw.ImageDraw, ann: dict, scale: float):
             y1,
             x2,
             y2,
+            cos_a,
+            sin_a,
             outline_color,
             width + outline_width * 2,
             head_len + outline_width * 2,
             head_width + outline_width * 2,
         )
 
-    _draw_arrow_primitive(draw, x1, y1, x2, y2, color, width, head_len, head_width)
-
-
-def _draw_text_outline(
-    draw: ImageDraw.ImageDraw,
-    x: float,
-    y: float,
-    text: str,
-    font: ImageFont.ImageFont,
-    stroke_width: int,
-    stroke_fill,
-):
-    if stroke_width <= 0:
-        return
-    for dx in range(-stroke_width, stroke_width + 1):
-        for dy in range(-stroke_width, stroke_width + 1):
-            if dx == 0 and dy == 0:
-                continue
-            if dx * dx + dy * dy > stroke_width * stroke_width:
-                continue
-            draw.text((x + dx, y + dy), text, fill=stroke_fill, font=font)
+    _draw_arrow_primitive(draw, x1, y1, x2, y2, cos_a, sin_a, color, width, head_len, head_width)
 
 
 def _draw_text(draw: ImageDraw.ImageDraw, ann: dict, scale: float):
@@ -698,9 +817,47 @@ def _draw_text(draw: ImageDraw.ImageDraw, ann: dict, scale: float):
             bbox[3] + padding,
         ]
         draw.rectangle(rect, fill=bg_color)
-    if outline_enabled and outline_color:
-        _draw_text_outline(draw, x, y, text, font, outline_width, outline_color)
-    draw.text((x, y), text, fill=color, font=font)
+    stroke_width = outline_width if outline_enabled and outline_color else 0
+    draw.text(
+        (x, y),
+        text,
+        fill=color,
+        font=font,
+        stroke_width=max(0, stroke_width),
+        stroke_fill=outline_color if stroke_width > 0 else None,
+    )
+
+
+def _composite_overlay(image: Image.Image, overlay: Image.Image) -> Image.Image:
+    bbox = overlay.getbbox()
+    if bbox is None:
+        return image
+    x0, y0, x1, y1 = bbox
+    if (x1 - x0) * (y1 - y0) * 2 > image.size[0] * image.size[1]:
+        return Image.alpha_composite(image, overlay)
+    # Small annotations: blend only the drawn region, in place.
+    image.alpha_composite(overlay, dest=(x0, y0), source=bbox)
+    return image
+
+
+SPOTLIGHT_TYPES = frozenset(("spotlight", "focus", "dim"))
+
+# type -> (anchor resolver or None, drawer)
+ANNOTATION_DRAWERS = {
+    "rect": (None, _draw_rect),
+    "arrow": (_apply_arrow_anchor, _draw_arrow),
+    "text": (_apply_text_anchor, _draw_text),
+}
+
+
+def _loads_json(raw: str):
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # stdlib json also accepts NaN/Infinity and oversized ints.
+            pass
+    return json.loads(raw)
 
 
 def _load_spec(path: str) -> Dict:
@@ -709,7 +866,7 @@ def _load_spec(path: str) -> Dict:
     else:
         with open(path, "r", encoding="utf-8") as f:
             raw = f.read()
-    data = json.loads(raw)
+    data = _loads_json(raw)
     if isinstance(data, list):
         return {"annotations": data, "defaults": {}}
     if isinstance(data, dict) and "annotations" in data:
@@ -747,6 +904,7 @@ def main() -> int:
 
     image = Image.open(args.input).convert("RGBA")
     image_rgb = image.convert("RGB")
+    planes = FitPlanes(image_rgb) if np is not None else None
     defaults = spec.get("defaults") or {}
     base_scale = _resolve_scale(defaults, image.size)
 
@@ -756,8 +914,7 @@ def main() -> int:
     for idx, ann in enumerate(annotations):
         if not isinstance(ann, dict):
             continue
-        ann_type = str(ann.get("type", "")).lower()
-        if ann_type in ("spotlight", "focus", "dim"):
+        if str(ann.get("type", "")).lower() in SPOTLIGHT_TYPES:
             spotlights.append((idx, ann))
         else:
             others.append((idx, ann))
@@ -768,7 +925,7 @@ def main() -> int:
 
     for idx, ann in spotlights:
         ann = _merge_defaults(defaults, ann)
-        ann = _apply_fit(ann, image_rgb, defaults)
+        ann = _apply_fit(ann, image_rgb, defaults, planes)
         prepared_spotlights.append(ann)
         bbox = _bbox_from_ann(ann)
         if bbox:
@@ -778,41 +935,43 @@ def main() -> int:
 
     for idx, ann in others:
         ann = _merge_defaults(defaults, ann)
+        # Read the type after merging: it may come from defaults alone.
         ann_type = str(ann.get("type", "")).lower()
+        if ann_type not in ANNOTATION_DRAWERS:
+            continue
         if ann_type == "rect":
-            ann = _apply_fit(ann, image_rgb, defaults)
+            ann = _apply_fit(ann, image_rgb, defaults, planes)
             bbox = _bbox_from_ann(ann)
             if bbox:
                 anchor_targets.append(
                     {"id": ann.get("id"), "index": idx, "type": "rect", "bbox": bbox}
                 )
-        prepared_others.append(ann)
+        prepared_others.append((ann_type, ann))
 
     overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    spotlight_masks = {}
     for ann in prepared_spotlights:
         ann_scale = float(ann.get("scale", base_scale))
         try:
-            overlay = _draw_spotlight(overlay, ann, ann_scale, defaults)
+            _draw_spotlight(spotlight_masks, image.size, ann, ann_scale, defaults)
         except Exception as exc:
             print(f"warn: failed annotation spotlight: {exc}", file=sys.stderr)
+    overlay = _composite_spotlights(overlay, spotlight_masks)
+    drew_any = bool(spotlight_masks)
 
     draw = ImageDraw.Draw(overlay)
-    for ann in prepared_others:
+    for ann_type, ann in prepared_others:
         ann_scale = float(ann.get("scale", base_scale))
-        ann_type = str(ann.get("type", "")).lower()
+        apply_anchor, draw_fn = ANNOTATION_DRAWERS[ann_type]
         try:
-            if ann_type == "rect":
-                _draw_rect(draw, ann, ann_scale)
-            elif ann_type == "arrow":
-                ann = _apply_arrow_anchor(ann, anchor_targets, defaults, image.size)
-                _draw_arrow(draw, ann, ann_scale)
-            elif ann_type == "text":
-                ann = _apply_text_anchor(ann, anchor_targets, defaults, image.size)
-                _draw_text(draw, ann, ann_scale)
+            if apply_anchor is not None:
+                ann = apply_anchor(ann, anchor_targets, defaults, image.size)
+            draw_fn(draw, ann, ann_scale)
+            drew_any = True
         except Exception as exc:
             print(f"warn: failed annotation {ann_type}: {exc}", file=sys.stderr)
 
-    combined = Image.alpha_composite(image, overlay)
+    combined = _composite_overlay(image, overlay) if drew_any else image
     out_dir = os.path.dirname(args.output)
     if out_dir:
         os.makedirs(out_dir, exist_ok=True)
@@ -7,12 +7,77 @@ import sys
 try:
     from PIL import Image, ImageChops
 except Exception:
-    print("error: Pillow is required. Install with: python3 -m pip install pillow", file=sys.stderr)
+    print(
+        "error: Pillow is required. Install with: python3 -m pip install pillow "
+        "(or pillow-simd, a faster drop-in build on AVX2 machines)",
+        file=sys.stderr,
+    )
     sys.exit(2)
 
+try:
+    import numpy as np
+except Exception:
+    np = None
+
 
 def load_image(path: str) -> Image.Image:
-    return Image.open(path).convert("RGBA")
+    # Stay in RGB unless the file carries alpha; the diff only reads color.
+    img = Image.open(path)
+    has_alpha = "A" in img.getbands() or "transparency" in img.info
+    return img.convert("RGBA" if has_alpha else "RGB")
+
+
+def diff_stats(diff: Image.Image):
+    if np is None:
+        gray = diff.convert("L")
+        hist = gray.histogram()
+        total = sum(hist)
+        changed = total - hist[0] if total else 0
+        avg = sum(i * c for i, c in enumerate(hist)) / (255 * total) if total else 0.0
+        return gray, total, changed, avg
+    d = np.asarray(diff, dtype=np.uint8)
+    # Same fixed-point ITU-R 601 weights Pillow uses for convert("L").
+    # Widen each channel before multiplying: NumPy 1.x value-based casting would
+    # otherwise keep uint8 * scalar products in uint16 and overflow.
+    acc = d[..., 0].astype(np.uint32)
+    acc *= 19595
+    tmp = d[..., 1].astype(np.uint32)
+    tmp *= 38470
+    acc += tmp
+    tmp[...] = d[..., 2]
+    tmp *= 7471
+    acc += tmp
+    acc += 0x8000
+    acc >>= 16
+    gray_arr = acc.astype(np.uint8)
+    hist = np.bincount(gray_arr.ravel(), minlength=256)
+    total = int(hist.sum())
+    changed = total - int(hist[0]) if total else 0
+    avg = float(np.arange(256, dtype=np.int64) @ hist) / (255 * total) if total else 0.0
+    return gray_arr, total, changed, avg
+
+
+def render_diff(current: Image.Image, gray) -> Image.Image:
+    if np is None:
+        overlay = Image.new("RGBA", current.size, (255, 0, 0, 0))
+        overlay.putalpha(gray)
+        return Image.alpha_composite(current.convert("RGBA"), overlay).convert("RGB")
+    # Integer blend of a red layer whose alpha is the gray diff, using the same
+    # fixed-point math as Pillow's alpha_composite so output is unchanged.
+    # The a == 0 case needs no special-casing: coef1 is 0 and the rounding
+    # below returns the current pixel unchanged.
+    cur = np.asarray(current, dtype=np.uint8)
+    a = gray.astype(np.uint32)
+    dst_a = cur[..., 3] if cur.shape[-1] == 4 else 255
+    outa255 = a * 255 + dst_a * (255 - a)
+    coef1 = a * (255 * 255 << 7) // np.maximum(outa255, 1)
+    coef2 = (255 << 7) - coef1
+    out = cur[..., :3] * coef2[..., None]
+    out[..., 0] += 255 * coef1
+    out += 0x80 << 7
+    out += out >> 8
+    out >>= 15
+    return Image.fromarray(out.astype(np.uint8), "RGB")
 
 
 def main() -> int:
@@ -46,12 +111,12 @@ def main() -> int:
             )
             return 1
 
+    if baseline.mode != current.mode:
+        baseline = baseline.convert("RGBA")
+        current = current.convert("RGBA")
+
     diff = ImageChops.difference(baseline, current)
-    gray = diff.convert("L")
-    hist = gray.histogram()
-    total = sum(hist)
-    changed = total - hist[0] if total else 0
-    avg = sum(i * c for i, c in enumerate(hist)) / (255 * total) if total else 0.0
+    gray, total, changed, avg = diff_stats(diff)
 
     percent_changed = (changed / total * 100) if total else 0.0
     avg_diff_percent = avg * 100
@@ -60,10 +125,7 @@ def main() -> int:
     if args.diff_out:
         diff_path = args.diff_out
         os.makedirs(os.path.dirname(diff_path), exist_ok=True)
-        overlay = Image.new("RGBA", current.size, (255, 0, 0, 0))
-        overlay.putalpha(gray)
-        diff_vis = Image.alpha_composite(current, overlay).convert("RGB")
-        diff_vis.save(diff_path)
+        render_diff(current, gray).save(diff_path)
 
     result = {
         "baseline": os.path.abspath(args.baseline),
@@ -7,12 +7,29 @@ import json
 import os
 import random
 import re
+import shutil
 import sys
 import time
 import uuid
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable, Literal
+from types import MappingProxyType
+from typing import Any, Iterable, Literal, Mapping
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import fcntl
+except Exception:
+    fcntl = None
+
+# Linux-only ioctl that clones a file's extents copy-on-write (btrfs, XFS, ...).
+_FICLONE = 0x40049409
 
 
 @dataclass(frozen=True)
@@ -94,10 +111,35 @@ COMPONENT_TYPES = (
 )
 
 
+_SLUG_WS_RE = re.compile(r"\s+")
+_SLUG_BAD_RE = re.compile(r"[^a-z0-9._-]+")
+_TRUTHY_RE = re.compile(r"\b(on|yes|true|enabled|checked|selected)\b")
+_FALSY_RE = re.compile(r"\b(off|no|false|disabled|unchecked|unselected)\b")
+
+# Phrase parsing runs per phrase per screen; compile its patterns once.
+_QUOTED_RE = re.compile(r'"[^"]+"|\'[^\']+\'')
+_ITEM_SPLIT_RE = re.compile(r"[,\n]+")
+_QUOTE_REF_RE = re.compile(r"__Q(\d+)__")
+_PRESET_KEY_RES = tuple((re.compile(rf"\b{re.escape(key)}\b"), preset) for key, preset in PRESETS.items())
+_SIZE_RE = re.compile(r"(\d{2,5})\s*[x×]\s*(\d{2,5})")
+_BULLET_RE = re.compile(r"^[-*•]\s*")
+_PHRASE_SPLIT_RE = re.compile(r"[;|]+")
+_SENTENCE_SPLIT_RE = re.compile(r"\.\s+")
+# Maps a matched component name to the COMPONENT_TYPES literal itself, so the
+# comp_type comparisons in _layout_screen succeed on the identity fast path.
+_COMPONENT_NAMES = {name: name for name in COMPONENT_TYPES}
+_COMPONENT_RE = re.compile(r"(?i)^\s*(" + "|".join(map(re.escape, COMPONENT_TYPES)) + r")\s*[:\-]\s*(.*)$")
+_ADD_CREATE_RE = re.compile(r"(?i)^\s*(add|create)\s+")
+_BUTTON_WORD_RE = re.compile(r"(?i)\bbutton\b")
+_PIPE_SPLIT_RE = re.compile(r"\s*\|\s*")
+_STATE_PAREN_RE = re.compile(r"\((on|off|true|false|enabled|disabled|checked|unchecked)\)", re.I)
+_STATE_WORD_RE = re.compile(r"\b(on|off|true|false|enabled|disabled|checked|unchecked)\b", re.I)
+
+
 def _slugify(value: str) -> str:
     slug = value.strip().lower()
-    slug = re.sub(r"\s+", "-", slug)
-    slug = re.sub(r"[^a-z0-9._-]+", "", slug)
+    slug = _SLUG_WS_RE.sub("-", slug)
+    slug = _SLUG_BAD_RE.sub("", slug)
     return slug or "wireframe"
 
 
@@ -111,14 +153,13 @@ _NOW_MS: int | None = None
 
 
 def _stable_seed(*parts: str) -> int:
-    h = hashlib.sha256()
-    for part in parts:
-        if part is None:
-            continue
-        h.update(part.encode("utf-8"))
-        h.update(b"\0")
+    # Not security-sensitive: blake2b with a 4-byte digest is plenty for seeding and cheaper than SHA-256.
+    # One joined buffer hashes exactly the bytes the per-part update() calls fed
+    # (each part NUL-terminated), so this yields the same seeds with one call.
+    data = "".join(f"{part}\0" for part in parts if part is not None).encode("utf-8")
+    digest = hashlib.blake2b(data, digest_size=4).digest()
     # Keep within signed 32-bit range for consistent downstream usage.
-    return int.from_bytes(h.digest()[:4], "big") & 0x7FFFFFFF
+    return int.from_bytes(digest, "big") & 0x7FFFFFFF
 
 
 def _new_id() -> str:
@@ -130,7 +171,11 @@ def _new_id() -> str:
 
 _ID_RNG: random.Random | None = None
 
+# Read once at import: the environment doesn't change under a running script.
+_OUT_ROOT = os.environ.get("SEER_OUT_DIR") or os.environ.get("SEER_TMP_DIR") or ".seer"
+
 
+@lru_cache(maxsize=1)
 def _default_library_path() -> Path:
     # scripts/ -> seer/
     seer_root = Path(__file__).resolve().parent.parent
@@ -141,66 +186,106 @@ def _default_library_path() -> Path:
     return seer_root / "assets" / "excalidraw" / "basic-ux-wireframing-elements.excalidrawlib"
 
 
+@lru_cache(maxsize=4)
 def _default_excalidraw_output_dir(out_root: str) -> str:
     return os.path.join(out_root, "excalidraw")
 
 
 def _round_to(value: float, step: int) -> int:
+    # round() on a number already returns an int, so no int() wrapping is needed.
+    # Keep round()'s half-to-even semantics: coordinates must not shift.
+    if step == 1:
+        return round(value)
     if step <= 0:
         return int(round(value))
-    return int(round(value / step) * step)
+    return round(value / step) * step
 
 
+@lru_cache(maxsize=4096)
 def _text_size(text: str, font_size: int) -> tuple[int, int]:
     # Excalidraw will usually recalc text metrics; keep this conservative.
-    lines = text.splitlines() or [""]
-    max_len = max((len(line) for line in lines), default=0)
+    # Labels repeat across screens/rows, and the result is an immutable tuple.
+    lines = text.splitlines()
+    if len(lines) <= 1:
+        # Common single-line label: skip the per-line generator.
+        max_len = len(lines[0]) if lines else 0
+        n_lines = 1
+    else:
+        max_len = max(len(line) for line in lines)
+        n_lines = len(lines)
     width = int(max(24, min(2400, max_len * font_size * 0.62)))
-    height = int(max(font_size + 8, len(lines) * font_size * 1.35))
+    height = int(max(font_size + 8, n_lines * font_size * 1.35))
     return width, height
 
 
 def _calc_label_width(text: str, font_size: int) -> int:
-    # BMAD heuristic: (len × fontSize × 0.6) + 20, rounded to 10px.
-    return _round_to(len(text) * font_size * 0.6 + 20, 10)
+    return _label_width(len(text), font_size)
 
 
-def _bbox_for_element(el: dict[str, Any]) -> tuple[float, float, float, float]:
-    x = float(el.get("x", 0.0))
-    y = float(el.get("y", 0.0))
-    w = float(el.get("width", 0.0))
-    h = float(el.get("height", 0.0))
-    x0 = min(x, x + w)
-    x1 = max(x, x + w)
-    y0 = min(y, y + h)
-    y1 = max(y, y + h)
-    return x0, y0, x1, y1
+@lru_cache(maxsize=4096)
+def _label_width(length: int, font_size: int) -> int:
+    # BMAD heuristic: (len × fontSize × 0.6) + 20, rounded to 10px. Only the length
+    # matters, and labels repeat a few font sizes, so results are memoized.
+    return _round_to(length * font_size * 0.6 + 20, 10)
 
 
-def _bbox_for_elements(elements: list[dict[str, Any]]) -> tuple[float, float, float, float]:
+def _bbox_for_elements(elements: Iterable[Mapping[str, Any]]) -> tuple[float, float, float, float]:
     if not elements:
         return 0.0, 0.0, 0.0, 0.0
-    x0, y0, x1, y1 = _bbox_for_element(elements[0])
-    for el in elements[1:]:
-        ex0, ey0, ex1, ey1 = _bbox_for_element(el)
-        x0 = min(x0, ex0)
-        y0 = min(y0, ey0)
-        x1 = max(x1, ex1)
-        y1 = max(y1, ey1)
-    return x0, y0, x1, y1
+    # Collect both edges of every element and reduce once with C-level min/max.
+    xs: list[float] = []
+    ys: list[float] = []
+    for el in elements:
+        x = float(el.get("x", 0.0))
+        y = float(el.get("y", 0.0))
+        xs.append(x)
+        xs.append(x + float(el.get("width", 0.0)))
+        ys.append(y)
+        ys.append(y + float(el.get("height", 0.0)))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _freeze_json(value: Any) -> Any:
+    # Read-only view of parsed JSON: dicts become mapping proxies, lists become tuples.
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze_json(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze_json(v) for v in value)
+    return value
+
+
+def _clone_json(value: Any) -> Any:
+    # Structural copy of (possibly frozen) JSON back into plain dicts/lists; much cheaper
+    # than a dumps/loads round-trip. Scalars (strings included) are shared, not copied.
+    # Parsed/frozen JSON never contains subclasses, so exact type checks suffice.
+    t = type(value)
+    if t is MappingProxyType or t is dict:
+        return {k: _clone_json(v) for k, v in value.items()}
+    if t is tuple or t is list:
+        return [_clone_json(v) for v in value]
+    return value
 
 
 @dataclass(frozen=True)
 class LibraryItem:
     name: str
     id: str
-    elements: list[dict[str, Any]]
+    # Frozen template (see _freeze_json); instantiate_library_item clones it into plain dicts.
+    elements: tuple[Mapping[str, Any], ...]
+    # Template geometry never changes, so its bbox is computed once up front.
+    bbox: tuple[float, float, float, float] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "bbox", _bbox_for_elements(self.elements))
 
 
 class ExcalidrawLibrary:
     def __init__(self, items: list[LibraryItem]):
         self._items = items
         self._by_name: dict[str, LibraryItem] = {it.name.strip().lower(): it for it in items if it.name}
+        self._lower_names = [(it.name or "").lower() for it in items]
+        # Items are fixed after load, so every query (hits and misses) is memoized.
+        self._found: dict[str, LibraryItem | None] = {}
 
     @property
     def items(self) -> list[LibraryItem]:
@@ -210,16 +295,39 @@ class ExcalidrawLibrary:
         q = query.strip().lower()
         if not q:
             return None
-        if q in self._by_name:
-            return self._by_name[q]
-        for it in self._items:
-            if q in (it.name or "").lower():
-                return it
-        return None
+        if q in self._found:
+            return self._found[q]
+        found = self._by_name.get(q)
+        if found is None:
+            for it, name in zip(self._items, self._lower_names):
+                if q in name:
+                    found = it
+                    break
+        self._found[q] = found
+        return found
+
+
+def _loads_json(raw: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # stdlib json also accepts NaN/Infinity and oversized ints.
+            pass
+    return json.loads(raw)
 
 
 def load_excalidraw_library(path: Path) -> ExcalidrawLibrary:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    # Keyed on mtime/size so an edited library is re-read, while in-process
+    # callers (the suite runner) parse each library file only once.
+    st = path.stat()
+    return _load_excalidraw_library(str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_excalidraw_library(path: str, mtime_ns: int, size: int) -> ExcalidrawLibrary:
+    # Parse straight from bytes: orjson skips the UTF-8 decode entirely.
+    data = _loads_json(Path(path).read_bytes())
     raw_items = data.get("libraryItems") or data.get("library") or []
     items: list[LibraryItem] = []
     for it in raw_items:
@@ -230,7 +338,7 @@ def load_excalidraw_library(path: Path) -> ExcalidrawLibrary:
         elements = it.get("elements") or []
         if not isinstance(elements, list) or not elements:
             continue
-        els: list[dict[str, Any]] = [e for e in elements if isinstance(e, dict)]
+        els = tuple(_freeze_json(e) for e in elements if isinstance(e, dict))
         if not els:
             continue
         items.append(LibraryItem(name=name or item_id, id=item_id, elements=els))
@@ -255,108 +363,96 @@ DEFAULT_LIBRARY_COMPONENT_QUERIES: dict[str, list[str]] = {
 }
 
 
+def _looks_truthy(s: str) -> bool:
+    return _TRUTHY_RE.search(s) is not None
+
+
+def _looks_falsy(s: str) -> bool:
+    return _FALSY_RE.search(s) is not None
+
+
+# Hand-picked primitives tried before the generic queries above, per component.
+_PREFERRED_LIBRARY_QUERIES: dict[str, tuple[str, ...]] = {
+    # Prefer a plain text field for non-search inputs.
+    "input": ("textfield", "Text field with placeholder", "Text field with text"),
+    "header": ("navigation bar",),
+    "button": ("button", "Filled button (text only)", "Outlined button (text only)"),
+    "dropdown": ("dropdown", "select"),
+    "textarea": ("textarea",),
+    "checkbox": ("checkbox-off", "Checkbox Unchecked"),
+    "radio": ("radiobutton-off",),
+    "toggle": ("toggle-off",),
+    "chips": ("chips",),
+    "card": ("banner", "carousel banner"),
+    "tabs": ("tabs", "tab bar"),
+    "image": ("product image", "gallery-3-a", "gallery-3-b", "Image placeholder"),
+    "footer": ("tab bar",),
+}
+
+# Tried first when a checkbox/radio/toggle label reads as "on".
+_ON_STATE_LIBRARY_QUERIES: dict[str, tuple[str, ...]] = {
+    "checkbox": ("checkbox-on", "Checkbox Checked"),
+    "radio": ("radiobutton-on",),
+    "toggle": ("toggle-on",),
+}
+
+
+def _query_plan(*groups: Iterable[str]) -> tuple[str, ...]:
+    # Ordered, de-duplicated: a query that missed once will miss again.
+    return tuple(dict.fromkeys(q for group in groups for q in group))
+
+
+_COMPONENT_QUERY_PLAN: dict[str, tuple[str, ...]] = {
+    comp: _query_plan(_PREFERRED_LIBRARY_QUERIES.get(comp, ()), DEFAULT_LIBRARY_COMPONENT_QUERIES.get(comp, ()))
+    for comp in {**_PREFERRED_LIBRARY_QUERIES, **DEFAULT_LIBRARY_COMPONENT_QUERIES}
+}
+_ON_STATE_QUERY_PLAN: dict[str, tuple[str, ...]] = {
+    comp: _query_plan(queries, _COMPONENT_QUERY_PLAN[comp]) for comp, queries in _ON_STATE_LIBRARY_QUERIES.items()
+}
+_SEARCH_INPUT_QUERY_PLAN = _query_plan(
+    _PREFERRED_LIBRARY_QUERIES["input"], ("search", "Search field", "Search Input"), _COMPONENT_QUERY_PLAN["input"]
+)
+
+
 def _pick_library_item_for_component(
     library: ExcalidrawLibrary, component_type: str, label: str | None = None
 ) -> LibraryItem | None:
     label = (label or "").strip().lower()
-
-    def _looks_truthy(s: str) -> bool:
-        return bool(re.search(r"\b(on|yes|true|enabled|checked|selected)\b", s))
-
-    def _looks_falsy(s: str) -> bool:
-        return bool(re.search(r"\b(off|no|false|disabled|unchecked|unselected)\b", s))
-
-    # Small heuristics to pick better primitives.
-    if component_type == "input" and label:
-        # Prefer a plain text field for non-search inputs.
-        it = library.find("textfield") or library.find("Text field with placeholder") or library.find("Text field with text")
-        if it:
-            return it
-        if "search" in label:
-            it = library.find("search") or library.find("Search field") or library.find("Search Input")
-            if it:
-                return it
-
-    if component_type == "header":
-        it = library.find("navigation bar")
-        if it:
-            return it
-
-    if component_type == "button":
-        it = library.find("button") or library.find("Filled button (text only)") or library.find("Outlined button (text only)")
-        if it:
-            return it
-
-    if component_type == "dropdown":
-        it = library.find("dropdown") or library.find("select")
-        if it:
-            return it
-
-    if component_type == "textarea":
-        it = library.find("textarea")
-        if it:
-            return it
-
-    if component_type == "checkbox":
+    plan = _COMPONENT_QUERY_PLAN.get(component_type, ())
+    if component_type in _ON_STATE_QUERY_PLAN:
         if label and _looks_truthy(label) and not _looks_falsy(label):
-            it = library.find("checkbox-on") or library.find("Checkbox Checked")
-            if it:
-                return it
-        it = library.find("checkbox-off") or library.find("Checkbox Unchecked")
-        if it:
-            return it
-
-    if component_type == "radio":
-        if label and _looks_truthy(label) and not _looks_falsy(label):
-            it = library.find("radiobutton-on")
-            if it:
-                return it
-        it = library.find("radiobutton-off")
-        if it:
-            return it
-
-    if component_type == "toggle":
-        if label and _looks_truthy(label) and not _looks_falsy(label):
-            it = library.find("toggle-on")
-            if it:
-                return it
-        it = library.find("toggle-off")
-        if it:
-            return it
-
-    if component_type == "chips":
-        it = library.find("chips")
-        if it:
-            return it
-
-    if component_type == "card":
-        it = library.find("banner") or library.find("carousel banner")
-        if it:
-            return it
-
-    if component_type == "tabs":
-        it = library.find("tabs") or library.find("tab bar")
-        if it:
-            return it
-
-    if component_type == "image":
-        it = library.find("product image") or library.find("gallery-3-a") or library.find("gallery-3-b") or library.find("Image placeholder")
-        if it:
-            return it
-
-    if component_type == "footer":
-        it = library.find("tab bar")
-        if it:
-            return it
-
-    for query in DEFAULT_LIBRARY_COMPONENT_QUERIES.get(component_type, []):
+            plan = _ON_STATE_QUERY_PLAN[component_type]
+    elif component_type == "input" and "search" in label:
+        plan = _SEARCH_INPUT_QUERY_PLAN
+
+    for query in plan:
         found = library.find(query)
         if found:
             return found
     return None
 
 
-def _rewrite_library_label(builder: "ExcalidrawBuilder", group_elements: list[dict[str, Any]], new_text: str) -> None:
+def _num(el: Mapping[str, Any], key: str, default: float = 0.0) -> float:
+    # Same as float(el.get(key) or default), minus the float() call for the common
+    # case: instantiated library geometry is already float.
+    v = el.get(key)
+    if type(v) is float and v:
+        return v
+    return float(v or default)
+
+
+def _group_index(group: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    # id -> element for a library group; built once and shared by the normalize/rewrite helpers.
+    return {el["id"]: el for el in group if type(el.get("id")) is str}
+
+
+def _rewrite_library_label(
+    builder: "ExcalidrawBuilder",
+    group_elements: list[dict[str, Any]],
+    new_text: str,
+    *,
+    by_id: dict[str, dict[str, Any]] | None = None,
+) -> None:
     new_text = new_text.strip()
     if not new_text:
         return
@@ -371,12 +467,20 @@ def _rewrite_library_label(builder: "ExcalidrawBuilder", group_elements: list[di
         s0 = 2 if t in preferred else 0
         if el.get("containerId"):
             s0 += 1
-        return (s0, float(el.get("width") or 0))
+        return (s0, _num(el, "width"))
 
-    target = sorted(texts, key=score, reverse=True)[0]
-    _set_library_text(builder, group_elements, target, new_text)
+    # max() keeps the first of equal scores, like sorted(reverse=True)[0].
+    target = max(texts, key=score)
+    _set_library_text(builder, group_elements, target, new_text, by_id=by_id)
 
-def _set_library_text(builder: "ExcalidrawBuilder", group_elements: list[dict[str, Any]], target: dict[str, Any], new_text: str) -> None:
+def _set_library_text(
+    builder: "ExcalidrawBuilder",
+    group_elements: list[dict[str, Any]],
+    target: dict[str, Any],
+    new_text: str,
+    *,
+    by_id: dict[str, dict[str, Any]] | None = None,
+) -> None:
     new_text = (new_text or "").strip()
     if not new_text:
         return
@@ -386,36 +490,44 @@ def _set_library_text(builder: "ExcalidrawBuilder", group_elements: list[dict[st
 
     container_id = target.get("containerId")
     if container_id:
-        by_id = {el.get("id"): el for el in group_elements}
+        if by_id is None:
+            by_id = _group_index(group_elements)
         container = by_id.get(container_id)
-        if isinstance(container, dict):
-            cw = float(container.get("width") or 0)
-            cx = float(container.get("x") or 0)
-            ch = float(container.get("height") or 0)
-            cy = float(container.get("y") or 0)
+        if type(container) is dict:
+            cw = _num(container, "width")
+            cx = _num(container, "x")
+            grid = builder.grid
 
-            font_size = int(float(target.get("fontSize") or 16))
-            new_w = min(int(cw - builder.grid * 2), _calc_label_width(new_text, font_size))
-            new_w = max(24, new_w)
-            target["width"] = float(_round_to(new_w, 10))
+            font_size = int(_num(target, "fontSize", 16))
+            new_w = min(int(cw - grid * 2), _calc_label_width(new_text, font_size))
+            width = float(_round_to(max(24, new_w), 10))
+            target["width"] = width
 
             if target.get("textAlign") == "center":
                 # Important: do NOT grid-snap library internals; it distorts layout.
-                target["x"] = float(_round_to(cx + (cw - float(target["width"])) / 2, 1))
-                target["y"] = float(_round_to(cy + (ch - float(target.get("height") or 20)) / 2, 1))
+                ch = _num(container, "height")
+                cy = _num(container, "y")
+                target["x"] = float(round(cx + (cw - width) / 2))
+                target["y"] = float(round(cy + (ch - _num(target, "height", 20)) / 2))
             else:
-                target["x"] = float(_round_to(cx + builder.grid, 1))
+                target["x"] = float(round(cx + grid))
     else:
         # Standalone library text often has a fixed width; update it to avoid clipping.
         try:
-            font_size = int(float(target.get("fontSize") or 16))
+            font_size = int(_num(target, "fontSize", 16))
         except Exception:
             font_size = 16
         target["width"] = float(_round_to(_calc_label_width(new_text, font_size), 10))
-        target["height"] = float(_round_to(max(float(target.get("height") or 0), font_size * 1.6), 10))
+        target["height"] = float(_round_to(max(_num(target, "height"), font_size * 1.6), 10))
 
 
-def _rewrite_library_tabs_labels(builder: "ExcalidrawBuilder", group_elements: list[dict[str, Any]], labels: list[str]) -> None:
+def _rewrite_library_tabs_labels(
+    builder: "ExcalidrawBuilder",
+    group_elements: list[dict[str, Any]],
+    labels: list[str],
+    *,
+    by_id: dict[str, dict[str, Any]] | None = None,
+) -> None:
     labels = [l.strip() for l in labels if l.strip()]
     if not labels:
         return
@@ -424,13 +536,15 @@ def _rewrite_library_tabs_labels(builder: "ExcalidrawBuilder", group_elements: l
         return
 
     # Assign left-to-right.
-    texts = sorted(texts, key=lambda el: float(el.get("x") or 0))
+    texts.sort(key=lambda el: _num(el, "x"))
     labels = labels[: len(texts)]
 
-    by_id = {el.get("id"): el for el in group_elements if isinstance(el.get("id"), str)}
+    # One id index for all tabs instead of one per _set_library_text call.
+    if by_id is None:
+        by_id = _group_index(group_elements)
 
     for el, label in zip(texts, labels, strict=False):
-        _set_library_text(builder, group_elements, el, label)
+        _set_library_text(builder, group_elements, el, label, by_id=by_id)
 
 
 def _rewrite_library_section_title(builder: "ExcalidrawBuilder", group_elements: list[dict[str, Any]], title: str) -> None:
@@ -440,7 +554,7 @@ def _rewrite_library_section_title(builder: "ExcalidrawBuilder", group_elements:
     texts = [el for el in group_elements if el.get("type") == "text" and isinstance(el.get("text"), str)]
     if not texts:
         return
-    texts = sorted(texts, key=lambda el: (float(el.get("y") or 0), float(el.get("x") or 0)))
+    texts.sort(key=lambda el: (_num(el, "y"), _num(el, "x")))
     # First line becomes the title; hide the optional "View All >" if present.
     _set_library_text(builder, group_elements, texts[0], title.upper())
     if len(texts) > 1:
@@ -455,23 +569,24 @@ def _rewrite_library_footer_labels(builder: "ExcalidrawBuilder", group_elements:
     texts = [el for el in group_elements if el.get("type") == "text" and isinstance(el.get("text"), str)]
     if not texts:
         return
-    texts = sorted(texts, key=lambda el: float(el.get("x") or 0))
+    texts.sort(key=lambda el: _num(el, "x"))
+    n_labels = len(labels)
     for idx, el in enumerate(texts):
-        if idx >= len(labels):
+        if idx >= n_labels:
             el["opacity"] = 0
             continue
         new_text = labels[idx]
-        cx = float(el.get("x") or 0) + float(el.get("width") or 0) / 2
+        cx = _num(el, "x") + _num(el, "width") / 2
         try:
-            font_size = int(float(el.get("fontSize") or 12))
+            font_size = int(_num(el, "fontSize", 12))
         except Exception:
             font_size = 12
         new_w = float(_round_to(_calc_label_width(new_text, font_size), 10))
         el["text"] = new_text
         el["originalText"] = new_text
         el["width"] = new_w
-        el["height"] = float(_round_to(max(float(el.get("height") or 0), font_size * 1.6), 10))
-        el["x"] = float(_round_to(cx - new_w / 2, 1))
+        el["height"] = float(_round_to(max(_num(el, "height"), font_size * 1.6), 10))
+        el["x"] = float(round(cx - new_w / 2))
 
 
 def _rewrite_library_label_and_placeholder(
@@ -480,6 +595,7 @@ def _rewrite_library_label_and_placeholder(
     *,
     label: str,
     placeholder: str,
+    by_id: dict[str, dict[str, Any]] | None = None,
 ) -> None:
     label = (label or "").strip()
     placeholder = (placeholder or "").strip()
@@ -494,16 +610,16 @@ def _rewrite_library_label_and_placeholder(
     placeholder_targets = [t for t in texts if t.get("containerId")]
 
     if label and label_targets:
-        target = sorted(label_targets, key=lambda el: (float(el.get("y") or 0), -float(el.get("width") or 0)))[0]
-        _set_library_text(builder, group_elements, target, label)
+        target = min(label_targets, key=lambda el: (_num(el, "y"), -_num(el, "width")))
+        _set_library_text(builder, group_elements, target, label, by_id=by_id)
     elif label_targets:
         for el in label_targets:
             el["opacity"] = 0
 
     if placeholder and placeholder_targets:
         # Prefer the widest placeholder.
-        target = sorted(placeholder_targets, key=lambda el: float(el.get("width") or 0), reverse=True)[0]
-        _set_library_text(builder, group_elements, target, placeholder)
+        target = max(placeholder_targets, key=lambda el: _num(el, "width"))
+        _set_library_text(builder, group_elements, target, placeholder, by_id=by_id)
 
 
 def instantiate_library_item(
@@ -515,61 +631,69 @@ def instantiate_library_item(
     label_override: str | None,
     seer_label: str | None,
 ) -> list[dict[str, Any]]:
-    copied: list[dict[str, Any]] = json.loads(json.dumps(item.elements))
+    copied: list[dict[str, Any]] = _clone_json(item.elements)
 
-    id_map: dict[str, str] = {}
-    group_map: dict[str, str] = {}
-    for el in copied:
-        old_id = str(el.get("id") or "")
-        if old_id:
-            id_map[old_id] = _new_id()
-        for gid in el.get("groupIds") or []:
-            if isinstance(gid, str) and gid and gid not in group_map:
-                group_map[gid] = _new_id()
-
-    min_x, min_y, _, _ = _bbox_for_elements(copied)
+    min_x, min_y, _, _ = item.bbox
     # Align the *group* placement to the grid, but keep internal offsets intact.
     dx = builder.snap(x) - min_x
     dy = builder.snap(y) - min_y
 
     now = _now_ms()
+    seeds = builder._seed_many(2 * len(copied))
 
-    for el in copied:
+    # `copied` is fresh output of _clone_json, so every container below is an exact
+    # dict/list and `type(x) is dict` stands in for the slower isinstance().
+
+    # Pass 1: fresh ids/groups, seeds and placement. Cross-element references
+    # need the complete id_map, so they are remapped in pass 2.
+    id_map: dict[str, str] = {}
+    group_map: dict[str, str] = {}
+    by_id: dict[str, dict[str, Any]] = {}
+    for idx, el in enumerate(copied):
         old_id = str(el.get("id") or "")
-        if old_id in id_map:
-            el["id"] = id_map[old_id]
+        if old_id:
+            new_id = id_map[old_id] = _new_id()
+            el["id"] = new_id
+        eid = el.get("id")
+        if type(eid) is str:
+            by_id[eid] = el
 
-        el["seed"] = builder._seed()
-        el["versionNonce"] = builder._seed()
+        gids = []
+        for gid in el.get("groupIds") or []:
+            if isinstance(gid, str) and gid:
+                new_gid = group_map.get(gid)
+                if new_gid is None:
+                    new_gid = group_map[gid] = _new_id()
+                gids.append(new_gid)
+        el["groupIds"] = gids
+
+        el["seed"] = seeds[2 * idx]
+        el["versionNonce"] = seeds[2 * idx + 1]
         el["updated"] = now
         el["isDeleted"] = False
         el["locked"] = False
 
         el.setdefault("customData", {})
-        if isinstance(el["customData"], dict):
+        if type(el["customData"]) is dict:
             el["customData"].setdefault("seerSource", "library")
             if seer_label:
                 el["customData"].setdefault("seerLabel", seer_label)
 
-        gids = []
-        for gid in el.get("groupIds") or []:
-            if isinstance(gid, str) and gid in group_map:
-                gids.append(group_map[gid])
-        el["groupIds"] = gids
-
         if "x" in el:
             el["x"] = float(_round_to(float(el["x"]) + dx, 1))
         if "y" in el:
             el["y"] = float(_round_to(float(el["y"]) + dy, 1))
 
+    # Pass 2: remap bindings now that every new id is known.
+    for el in copied:
         container_id = el.get("containerId")
         if isinstance(container_id, str) and container_id in id_map:
             el["containerId"] = id_map[container_id]
 
-        if isinstance(el.get("boundElements"), list):
+        if type(el.get("boundElements")) is list:
             new_bound = []
             for b in el["boundElements"]:
-                if not isinstance(b, dict):
+                if type(b) is not dict:
                     continue
                 bid = b.get("id")
                 if isinstance(bid, str) and bid in id_map:
@@ -580,15 +704,14 @@ def instantiate_library_item(
 
         for key in ("startBinding", "endBinding"):
             b = el.get(key)
-            if isinstance(b, dict):
+            if type(b) is dict:
                 eid = b.get("elementId")
                 if isinstance(eid, str) and eid in id_map:
                     b = dict(b)
                     b["elementId"] = id_map[eid]
                     el[key] = b
 
-    # Normalize container/text invariants.
-    by_id = {el.get("id"): el for el in copied if isinstance(el.get("id"), str)}
+    # Normalize container/text invariants (by_id was filled in pass 1).
     for el in copied:
         if el.get("type") != "text":
             continue
@@ -596,22 +719,66 @@ def instantiate_library_item(
         if not isinstance(container_id, str) or not container_id:
             continue
         container = by_id.get(container_id)
-        if not isinstance(container, dict):
+        if type(container) is not dict:
             continue
         el["groupIds"] = container.get("groupIds") or []
         bound = container.get("boundElements")
-        if not isinstance(bound, list):
+        if type(bound) is not list:
             bound = []
-        if not any(isinstance(b, dict) and b.get("type") == "text" and b.get("id") == el["id"] for b in bound):
+        if not any(type(b) is dict and b.get("type") == "text" and b.get("id") == el["id"] for b in bound):
             bound.append({"type": "text", "id": el["id"]})
         container["boundElements"] = bound
 
     if label_override:
-        _rewrite_library_label(builder, copied, label_override)
+        _rewrite_library_label(builder, copied, label_override, by_id=by_id)
 
     return copied
 
 
+# Common element fields in Excalidraw's key order. Per-call fields hold placeholders;
+# every value here is immutable, so templates built from it can be shallow-copied.
+_ELEMENT_BASE: dict[str, Any] = {
+    "id": "",
+    "type": "",
+    "x": 0.0,
+    "y": 0.0,
+    "width": 0.0,
+    "height": 0.0,
+    "angle": 0,
+    "strokeColor": "",
+    "backgroundColor": "transparent",
+    "fillStyle": "hachure",
+    "strokeWidth": 1,
+    "strokeStyle": "solid",
+    "roughness": 0,
+    "opacity": 100,
+    "groupIds": None,
+    "roundness": None,
+    "seed": 0,
+    "version": 1,
+    "versionNonce": 0,
+    "isDeleted": False,
+    "boundElements": None,
+    "updated": 0,
+    "link": None,
+    "locked": False,
+}
+
+_TEXT_TEMPLATE: dict[str, Any] = {
+    **_ELEMENT_BASE,
+    "type": "text",
+    "text": "",
+    "fontSize": 16,
+    "fontFamily": 1,  # 1 = Virgil
+    "textAlign": "left",
+    "verticalAlign": "top",
+    "baseline": 0,
+    "containerId": None,
+    "originalText": "",
+    "lineHeight": 1.25,
+}
+
+
 class ExcalidrawBuilder:
     """
     A tiny Excalidraw scene builder that enforces BMAD-style invariants:
@@ -624,6 +791,35 @@ class ExcalidrawBuilder:
         self._grid = max(1, int(grid))
         self._theme = theme
         self._fidelity = fidelity
+        self._style = self._compute_shape_style()
+        # Theme/style-dependent templates; rect/line copy() these and fill per-call fields.
+        style = self._style
+        self._rect_template: dict[str, Any] = {
+            **_ELEMENT_BASE,
+            "type": "rectangle",
+            "strokeColor": style["strokeColor"],
+            "backgroundColor": style["backgroundColor"],
+            "fillStyle": style["fillStyle"],
+            "strokeWidth": style["strokeWidth"],
+            "roughness": style["roughness"],
+        }
+        # Unfilled variant for screen boundaries and tab strips.
+        self._outline_rect_template: dict[str, Any] = {
+            **self._rect_template,
+            "backgroundColor": "transparent",
+            "fillStyle": "hachure",
+        }
+        self._line_template: dict[str, Any] = {
+            **_ELEMENT_BASE,
+            "type": "line",
+            "strokeColor": theme.border,
+            "points": None,
+            "lastCommittedPoint": None,
+            "startBinding": None,
+            "endBinding": None,
+            "startArrowhead": None,
+            "endArrowhead": None,
+        }
 
     @property
     def grid(self) -> int:
@@ -638,12 +834,33 @@ class ExcalidrawBuilder:
         return self._fidelity
 
     def _seed(self) -> int:
-        return self._rng.randint(1, 2**31 - 1)
+        # Uniform over [1, 2**31 - 1]: getrandbits skips randint's range math; 0 is redrawn.
+        v = self._rng.getrandbits(31)
+        while not v:
+            v = self._rng.getrandbits(31)
+        return v
+
+    def _seed_many(self, n: int) -> list[int]:
+        # Same draws, in the same order, as n calls to _seed().
+        getrandbits = self._rng.getrandbits
+        seeds = []
+        for _ in range(n):
+            v = getrandbits(31)
+            while not v:
+                v = getrandbits(31)
+            seeds.append(v)
+        return seeds
 
     def snap(self, value: float) -> int:
-        return _round_to(value, self._grid)
+        # Inlined _round_to(value, self._grid); grid is always >= 1.
+        grid = self._grid
+        return round(value / grid) * grid
 
     def _shape_style(self) -> dict[str, Any]:
+        # Theme and fidelity are fixed per builder; callers only read the shared dict.
+        return self._style
+
+    def _compute_shape_style(self) -> dict[str, Any]:
         # Keep wireframes readable and consistent.
         if self._fidelity == "low":
             return {
@@ -679,34 +896,20 @@ class ExcalidrawBuilder:
         roundness: int | None = 4,
         seer_label: str | None = None,
         custom_data: dict[str, Any] | None = None,
+        outline: bool = False,
     ) -> dict[str, Any]:
-        style = self._shape_style()
-        el: dict[str, Any] = {
-            "id": _new_id(),
-            "type": "rectangle",
-            "x": float(self.snap(x)),
-            "y": float(self.snap(y)),
-            "width": float(self.snap(w)),
-            "height": float(self.snap(h)),
-            "angle": 0,
-            "strokeColor": style["strokeColor"],
-            "backgroundColor": style["backgroundColor"],
-            "fillStyle": style["fillStyle"],
-            "strokeWidth": style["strokeWidth"],
-            "strokeStyle": "solid",
-            "roughness": style["roughness"],
-            "opacity": 100,
-            "groupIds": [],
-            "roundness": {"type": 3, "value": int(roundness)} if roundness is not None else None,
-            "seed": self._seed(),
-            "version": 1,
-            "versionNonce": self._seed(),
-            "isDeleted": False,
-            "boundElements": None,
-            "updated": _now_ms(),
-            "link": None,
-            "locked": False,
-        }
+        el = (self._outline_rect_template if outline else self._rect_template).copy()
+        el["id"] = _new_id()
+        el["x"] = float(self.snap(x))
+        el["y"] = float(self.snap(y))
+        el["width"] = float(self.snap(w))
+        el["height"] = float(self.snap(h))
+        el["groupIds"] = []
+        if roundness is not None:
+            el["roundness"] = {"type": 3, "value": int(roundness)}
+        el["seed"] = self._seed()
+        el["versionNonce"] = self._seed()
+        el["updated"] = _now_ms()
         if seer_label:
             el["customData"] = {"seerLabel": seer_label}
         if custom_data:
@@ -734,79 +937,43 @@ class ExcalidrawBuilder:
             w0, h0 = _text_size(text, font_size)
             width = width or w0
             height = height or h0
-        return {
-            "id": _new_id(),
-            "type": "text",
-            "x": float(self.snap(x)),
-            "y": float(self.snap(y)),
-            "width": float(_round_to(width, 10)),
-            "height": float(_round_to(height, 10)),
-            "angle": 0,
-            "strokeColor": color,
-            "backgroundColor": "transparent",
-            "fillStyle": "hachure",
-            "strokeWidth": 1,
-            "strokeStyle": "solid",
-            "roughness": 0,
-            "opacity": 100,
-            "groupIds": group_ids or [],
-            "roundness": None,
-            "seed": self._seed(),
-            "version": 1,
-            "versionNonce": self._seed(),
-            "isDeleted": False,
-            "boundElements": None,
-            "updated": _now_ms(),
-            "link": None,
-            "locked": False,
-            "text": text,
-            "fontSize": int(font_size),
-            "fontFamily": 1,  # 1 = Virgil
-            "textAlign": align,
-            "verticalAlign": valign,
-            "baseline": int(font_size * 1.2),
-            "containerId": container_id,
-            "originalText": text,
-            "lineHeight": 1.25,
-        }
+        el = _TEXT_TEMPLATE.copy()
+        el["id"] = _new_id()
+        el["x"] = float(self.snap(x))
+        el["y"] = float(self.snap(y))
+        el["width"] = float(_round_to(width, 10))
+        el["height"] = float(_round_to(height, 10))
+        el["strokeColor"] = color
+        el["groupIds"] = group_ids or []
+        el["seed"] = self._seed()
+        el["versionNonce"] = self._seed()
+        el["updated"] = _now_ms()
+        el["text"] = text
+        el["fontSize"] = int(font_size)
+        el["textAlign"] = align
+        el["verticalAlign"] = valign
+        el["baseline"] = int(font_size * 1.2)
+        el["containerId"] = container_id
+        el["originalText"] = text
+        return el
 
     def line(self, *, x: float, y: float, x2: float, y2: float) -> dict[str, Any]:
         x0 = self.snap(x)
         y0 = self.snap(y)
         x1 = self.snap(x2)
         y1 = self.snap(y2)
-        return {
-            "id": _new_id(),
-            "type": "line",
-            "x": float(x0),
-            "y": float(y0),
-            "width": float(x1 - x0),
-            "height": float(y1 - y0),
-            "angle": 0,
-            "strokeColor": self._theme.border,
-            "backgroundColor": "transparent",
-            "fillStyle": "hachure",
-            "strokeWidth": 1,
-            "strokeStyle": "solid",
-            "roughness": 0,
-            "opacity": 100,
-            "groupIds": [],
-            "roundness": None,
-            "seed": self._seed(),
-            "version": 1,
-            "versionNonce": self._seed(),
-            "isDeleted": False,
-            "boundElements": None,
-            "updated": _now_ms(),
-            "link": None,
-            "locked": False,
-            "points": [[0, 0], [float(x1 - x0), float(y1 - y0)]],
-            "lastCommittedPoint": None,
-            "startBinding": None,
-            "endBinding": None,
-            "startArrowhead": None,
-            "endArrowhead": None,
-        }
+        el = self._line_template.copy()
+        el["id"] = _new_id()
+        el["x"] = float(x0)
+        el["y"] = float(y0)
+        el["width"] = float(x1 - x0)
+        el["height"] = float(y1 - y0)
+        el["groupIds"] = []
+        el["seed"] = self._seed()
+        el["versionNonce"] = self._seed()
+        el["updated"] = _now_ms()
+        el["points"] = [[0, 0], [float(x1 - x0), float(y1 - y0)]]
+        return el
 
     def labeled_rect(
         self,
@@ -861,10 +1028,12 @@ def _fit_group_to_bounds(
     *,
     max_w: float | None,
     max_h: float | None,
+    bbox: tuple[float, float, float, float] | None = None,
 ) -> float:
+    # Returns 1.0 iff the group was left untouched, so callers can keep using `bbox`.
     if not group:
         return 1.0
-    gx0, gy0, gx1, gy1 = _bbox_for_elements(group)
+    gx0, gy0, gx1, gy1 = bbox if bbox is not None else _bbox_for_elements(group)
     w = float(gx1 - gx0)
     h = float(gy1 - gy0)
     if w <= 0 or h <= 0:
@@ -879,39 +1048,37 @@ def _fit_group_to_bounds(
     if scale >= 0.999:
         return 1.0
 
-    def sx(v: float) -> float:
-        return gx0 + (v - gx0) * scale
-
-    def sy(v: float) -> float:
-        return gy0 + (v - gy0) * scale
-
+    # Library groups are a handful of elements, so a tight scalar loop is cheaper
+    # than staging NumPy arrays. round(v) == _round_to(v, 1) without the call.
     for el in group:
         if "x" in el:
             try:
-                el["x"] = float(_round_to(sx(float(el["x"])), 1))
+                el["x"] = float(round(gx0 + (float(el["x"]) - gx0) * scale))
             except Exception:
                 pass
         if "y" in el:
             try:
-                el["y"] = float(_round_to(sy(float(el["y"])), 1))
+                el["y"] = float(round(gy0 + (float(el["y"]) - gy0) * scale))
             except Exception:
                 pass
         for k in ("width", "height"):
-            if k in el and el[k] is not None:
+            v = el.get(k)
+            if v is not None:
                 try:
-                    el[k] = float(_round_to(float(el[k]) * scale, 1))
+                    el[k] = float(round(float(v) * scale))
                 except Exception:
                     pass
-        if isinstance(el.get("points"), list):
+        points = el.get("points")
+        if isinstance(points, list):
             pts = []
-            for p in el["points"]:
-                if not isinstance(p, list) or len(p) < 2:
-                    pts.append(p)
-                    continue
-                try:
-                    pts.append([float(_round_to(float(p[0]) * scale, 1)), float(_round_to(float(p[1]) * scale, 1))])
-                except Exception:
-                    pts.append(p)
+            for p in points:
+                if type(p) is list and len(p) >= 2:
+                    try:
+                        pts.append([float(round(float(p[0]) * scale)), float(round(float(p[1]) * scale))])
+                        continue
+                    except Exception:
+                        pass
+                pts.append(p)
             el["points"] = pts
         if el.get("type") == "text":
             for k in ("fontSize", "baseline"):
@@ -933,75 +1100,112 @@ def _offset_group(group: list[dict[str, Any]], *, dx: float = 0.0, dy: float = 0
     if not group or (dx == 0 and dy == 0):
         return
     for el in group:
-        if "x" in el:
+        # Coordinates are numbers in practice; only odd values take the coercing path.
+        # round(v) == _round_to(v, 1).
+        vx = el.get("x")
+        if type(vx) is float or type(vx) is int:
+            el["x"] = float(round(vx + dx))
+        elif "x" in el:
             try:
-                el["x"] = float(_round_to(float(el["x"]) + dx, 1))
+                el["x"] = float(round(float(vx) + dx))
             except Exception:
                 pass
-        if "y" in el:
+        vy = el.get("y")
+        if type(vy) is float or type(vy) is int:
+            el["y"] = float(round(vy + dy))
+        elif "y" in el:
             try:
-                el["y"] = float(_round_to(float(el["y"]) + dy, 1))
+                el["y"] = float(round(float(vy) + dy))
             except Exception:
                 pass
 
 
+# Shape types that can make up trailing header actions (icons, buttons).
+_HEADER_ACTION_TYPES = frozenset(("line", "ellipse", "diamond", "rectangle"))
+# Shape types that take the theme's border stroke.
+_STROKE_SHAPE_TYPES = frozenset(("rectangle", "ellipse", "diamond", "line", "arrow"))
+
+
 def _simplify_library_header(group: list[dict[str, Any]], *, keep_actions: bool) -> None:
     if not group or keep_actions:
         return
     gx0, _, gx1, _ = _bbox_for_elements(group)
     cutoff = gx0 + (gx1 - gx0) * 0.65
-    to_remove: list[dict[str, Any]] = []
+    # Single filtering pass; the list is updated in place since callers hold it.
+    kept: list[dict[str, Any]] = []
     for el in group:
-        if el.get("type") not in ("line", "ellipse", "diamond", "rectangle"):
-            continue
-        try:
-            if float(el.get("x") or 0) > cutoff:
-                to_remove.append(el)
-        except Exception:
-            continue
-    if to_remove:
-        for el in to_remove:
-            if el in group:
-                group.remove(el)
+        if el.get("type") in _HEADER_ACTION_TYPES:
+            vx = el.get("x")
+            if type(vx) is not float:
+                try:
+                    vx = float(vx or 0)
+                except Exception:
+                    vx = None
+            if vx is not None and vx > cutoff:
+                continue
+        kept.append(el)
+    if len(kept) != len(group):
+        group[:] = kept
 
 
 def _apply_theme_to_library_group(builder: ExcalidrawBuilder, group: list[dict[str, Any]]) -> None:
     if not group:
         return
-    stroke = builder.theme.border
-    text_color = builder.theme.text
+    theme = builder.theme
+    stroke = theme.border
+    text_color = theme.text
+    container_color = theme.container
     stroke_width = builder._shape_style().get("strokeWidth", 2)
+    # One pass applies the regular theme and finds the group label (the first seerLabel).
+    # Button styling depends on that label, so it is patched onto the collected
+    # texts/rects afterwards instead of pre-scanning the group.
     group_label = None
-    for el in group:
-        custom = el.get("customData")
-        if isinstance(custom, dict) and custom.get("seerLabel"):
-            group_label = custom.get("seerLabel")
-            break
-    is_button = group_label == "button"
+    texts: list[dict[str, Any]] = []
+    rects: list[dict[str, Any]] = []
     for el in group:
         etype = el.get("type")
         label = None
         custom = el.get("customData")
-        if isinstance(custom, dict):
+        if type(custom) is dict:
             label = custom.get("seerLabel")
+            if label and not group_label:
+                group_label = label
         if etype == "text":
-            if is_button:
-                el["strokeColor"] = "#ffffff"
-            else:
-                el["strokeColor"] = text_color
+            el["strokeColor"] = text_color
+            texts.append(el)
             continue
-        if etype in ("rectangle", "ellipse", "diamond", "line", "arrow"):
+        if etype in _STROKE_SHAPE_TYPES:
             el["strokeColor"] = stroke
             if "strokeWidth" in el and el["strokeWidth"] is not None:
                 el["strokeWidth"] = stroke_width
-            if is_button and etype == "rectangle":
-                if not el.get("backgroundColor") or el.get("backgroundColor") == "transparent":
-                    el["backgroundColor"] = "#1e1e1e"
-                el["fillStyle"] = "solid"
-            if etype == "rectangle" and label in ("card", "image"):
-                el["backgroundColor"] = builder.theme.container
-                el["fillStyle"] = "solid"
-                el["roundness"] = {"type": 3, "value": 8}
+            if etype == "rectangle":
+                if label in ("card", "image"):
+                    el["backgroundColor"] = container_color
+                    el["fillStyle"] = "solid"
+                    el["roundness"] = {"type": 3, "value": 8}
+                else:
+                    rects.append(el)
+    if group_label == "button":
+        for el in texts:
+            el["strokeColor"] = "#ffffff"
+        for el in rects:
+            if not el.get("backgroundColor") or el.get("backgroundColor") == "transparent":
+                el["backgroundColor"] = "#1e1e1e"
+            el["fillStyle"] = "solid"
+
+
+def _first_bound_rect(group: list[dict[str, Any]], by_id: dict[str, dict[str, Any]]) -> dict[str, Any] | None:
+    # The library component's container, resolved from the first bound text's
+    # containerId through the shared index rather than by matching rectangles.
+    for el in group:
+        container_id = el.get("containerId")
+        if not container_id or el.get("type") != "text":
+            continue
+        container = by_id.get(container_id)
+        if container is not None and container.get("type") == "rectangle" and container.get("boundElements"):
+            return container
+    return None
+
 
 def _normalize_input_group(
     builder: ExcalidrawBuilder,
@@ -1011,14 +1215,13 @@ def _normalize_input_group(
     y: float,
     w: float,
     h: float,
+    by_id: dict[str, dict[str, Any]] | None = None,
 ) -> None:
     if not group:
         return
-    rect = None
-    for el in group:
-        if el.get("type") == "rectangle" and el.get("boundElements"):
-            rect = el
-            break
+    if by_id is None:
+        by_id = _group_index(group)
+    rect = _first_bound_rect(group, by_id)
     if not rect:
         return
     rect["x"] = float(_round_to(x, 1))
@@ -1027,7 +1230,7 @@ def _normalize_input_group(
     rect["height"] = float(_round_to(h, 1))
 
     # Align placeholder text inside the new bounds.
-    by_id = {el.get("id"): el for el in group if isinstance(el.get("id"), str)}
+    grid = builder.grid
     for b in rect.get("boundElements") or []:
         if not isinstance(b, dict):
             continue
@@ -1039,14 +1242,14 @@ def _normalize_input_group(
         if not new_text:
             continue
         try:
-            font_size = int(float(text_el.get("fontSize") or 14))
+            font_size = int(_num(text_el, "fontSize", 14))
         except Exception:
             font_size = 14
-        new_w = min(int(w - builder.grid * 2), _calc_label_width(new_text, font_size))
+        new_w = min(int(w - grid * 2), _calc_label_width(new_text, font_size))
         new_w = max(24, new_w)
         text_el["width"] = float(_round_to(new_w, 10))
-        text_el["height"] = float(_round_to(max(float(text_el.get("height") or 0), font_size * 1.6), 10))
-        text_el["x"] = float(_round_to(x + builder.grid, 1))
+        text_el["height"] = float(_round_to(max(_num(text_el, "height"), font_size * 1.6), 10))
+        text_el["x"] = float(_round_to(x + grid, 1))
         text_el["y"] = float(_round_to(y + (h - float(text_el["height"])) / 2, 1))
 
 
@@ -1058,14 +1261,13 @@ def _normalize_card_group(
     y: float,
     w: float,
     h: float,
+    by_id: dict[str, dict[str, Any]] | None = None,
 ) -> None:
     if not group:
         return
-    rect = None
-    for el in group:
-        if el.get("type") == "rectangle" and el.get("boundElements"):
-            rect = el
-            break
+    if by_id is None:
+        by_id = _group_index(group)
+    rect = _first_bound_rect(group, by_id)
     if not rect:
         return
     rect["x"] = float(_round_to(x, 1))
@@ -1073,7 +1275,6 @@ def _normalize_card_group(
     rect["width"] = float(_round_to(w, 1))
     rect["height"] = float(_round_to(h, 1))
     # Re-center label text if present.
-    by_id = {el.get("id"): el for el in group if isinstance(el.get("id"), str)}
     for b in rect.get("boundElements") or []:
         if not isinstance(b, dict):
             continue
@@ -1081,7 +1282,7 @@ def _normalize_card_group(
         if tid not in by_id:
             continue
         text_el = by_id[tid]
-        _set_library_text(builder, group, text_el, str(text_el.get("text") or ""))
+        _set_library_text(builder, group, text_el, str(text_el.get("text") or ""), by_id=by_id)
 
 
 def _normalize_header_group(
@@ -1095,6 +1296,7 @@ def _normalize_header_group(
 ) -> None:
     if not group:
         return
+    grid = builder.grid
     rect = None
     for el in group:
         if el.get("type") != "rectangle":
@@ -1115,40 +1317,43 @@ def _normalize_header_group(
     texts = [el for el in group if el.get("type") == "text" and isinstance(el.get("text"), str)]
     if not texts:
         return
-    target = sorted(texts, key=lambda el: (float(el.get("y") or 0), float(el.get("x") or 0)))[0]
+    # Top-most, then left-most text; min() keeps the first on ties like sorted()[0].
+    target = min(texts, key=lambda el: (_num(el, "y"), _num(el, "x")))
     new_text = str(target.get("text") or "").strip()
     if not new_text:
         return
     try:
-        font_size = int(float(target.get("fontSize") or 16))
+        font_size = int(_num(target, "fontSize", 16))
     except Exception:
         font_size = 16
-    new_w = min(int(w - builder.grid * 2), _calc_label_width(new_text, font_size))
+    new_w = min(int(w - grid * 2), _calc_label_width(new_text, font_size))
     new_w = max(24, new_w)
     target["width"] = float(_round_to(new_w, 10))
-    target["height"] = float(_round_to(max(float(target.get("height") or 0), font_size * 1.6), 10))
+    target["height"] = float(_round_to(max(_num(target, "height"), font_size * 1.6), 10))
     target["textAlign"] = "left"
-    target["x"] = float(_round_to(x + builder.grid, 1))
+    target["x"] = float(_round_to(x + grid, 1))
     target["y"] = float(_round_to(y + (h - float(target["height"])) / 2, 1))
 
     icon_elems = [el for el in group if el.get("type") in ("line", "ellipse", "diamond", "arrow")]
     if icon_elems:
         ix0, iy0, ix1, iy1 = _bbox_for_elements(icon_elems)
         icon_center = (iy0 + iy1) / 2
-        rect_center = float(rect.get("y") or y) + float(rect.get("height") or h) / 2
+        rect_center = _num(rect, "y", y) + _num(rect, "height", h) / 2
         dy = rect_center - icon_center
         if abs(dy) >= 1:
             _offset_group(icon_elems, dy=dy)
         # Add a little left padding for leading icons (e.g., hamburger).
-        left_cluster = [el for el in icon_elems if float(el.get("x") or 0) <= float(rect["x"]) + float(rect["width"]) * 0.4]
+        rect_x = float(rect["x"])
+        cluster_max_x = rect_x + float(rect["width"]) * 0.4
+        left_cluster = [el for el in icon_elems if _num(el, "x") <= cluster_max_x]
         if left_cluster:
             lx0, _, lx1, _ = _bbox_for_elements(left_cluster)
-            desired_left = float(rect["x"]) + builder.grid / 2
+            desired_left = rect_x + grid / 2
             dx = desired_left - lx0
             if abs(dx) >= 1:
                 _offset_group(left_cluster, dx=dx)
-            min_text_x = lx1 + builder.grid * 0.5 + dx
-            if float(target.get("x") or 0) < min_text_x:
+            min_text_x = lx1 + grid * 0.5 + dx
+            if _num(target, "x") < min_text_x:
                 target["x"] = float(_round_to(min_text_x, 1))
 
 
@@ -1168,18 +1373,26 @@ def _split_items(text: str) -> list[str]:
         quoted.append(m.group(0)[1:-1])
         return f"__Q{len(quoted)-1}__"
 
-    tmp = re.sub(r'"[^"]+"|\'[^\']+\'', _q, text)
-    parts = [p.strip() for p in re.split(r"[,\n]+", tmp) if p.strip()]
+    tmp = _QUOTED_RE.sub(_q, text)
+    parts = [p.strip() for p in _ITEM_SPLIT_RE.split(tmp) if p.strip()]
     out: list[str] = []
     for p in parts:
-        out.append(re.sub(r"__Q(\d+)__", lambda m: quoted[int(m.group(1))], p).strip())
+        out.append(_QUOTE_REF_RE.sub(lambda m: quoted[int(m.group(1))], p).strip())
     return out
 
 
+def _split_labels(label: str) -> list[str]:
+    # `A | B | C` for tabs/footers; a single segment falls back to comma/newline items.
+    parts = [t for t in (p.strip() for p in _PIPE_SPLIT_RE.split(label)) if t]
+    if len(parts) <= 1:
+        return _split_items(label)
+    return parts
+
+
 def _infer_preset(text: str) -> CanvasPreset:
     lowered = text.lower()
-    for key, preset in PRESETS.items():
-        if re.search(rf"\b{re.escape(key)}\b", lowered):
+    for key_re, preset in _PRESET_KEY_RES:
+        if key_re.search(lowered):
             return preset
     if "iphone" in lowered or "ios" in lowered or "android" in lowered or "mobile" in lowered:
         return PRESETS["mobile"]
@@ -1189,7 +1402,7 @@ def _infer_preset(text: str) -> CanvasPreset:
 
 
 def _infer_size(text: str) -> tuple[int, int] | None:
-    m = re.search(r"(\d{2,5})\s*[x×]\s*(\d{2,5})", text)
+    m = _SIZE_RE.search(text)
     if not m:
         return None
     w = int(m.group(1))
@@ -1203,34 +1416,34 @@ def _iter_phrases(text: str) -> Iterable[str]:
     raw_lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
     if len(raw_lines) >= 2:
         for ln in raw_lines:
-            yield re.sub(r"^[-*•]\s*", "", ln).strip()
+            yield _BULLET_RE.sub("", ln).strip()
         return
 
-    parts = [p.strip() for p in re.split(r"[;|]+", text) if p.strip()]
+    parts = [p.strip() for p in _PHRASE_SPLIT_RE.split(text) if p.strip()]
     if len(parts) == 1:
-        parts = [p.strip() for p in re.split(r"\.\s+", text) if p.strip()]
+        parts = [p.strip() for p in _SENTENCE_SPLIT_RE.split(text) if p.strip()]
     for p in parts:
         yield p
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScreenSpec:
     name: str
     phrases: list[str]
 
 
 def _parse_component(phrase: str) -> tuple[str, str]:
-    m = re.match(r"(?i)^\s*(" + "|".join(map(re.escape, COMPONENT_TYPES)) + r")\s*[:\-]\s*(.*)$", phrase)
+    m = _COMPONENT_RE.match(phrase)
     if m:
-        return m.group(1).lower(), m.group(2).strip()
+        return _COMPONENT_NAMES[m.group(1).lower()], m.group(2).strip()
 
     lowered = phrase.lower()
     if lowered.startswith("add ") or lowered.startswith("create "):
-        phrase = re.sub(r"(?i)^\s*(add|create)\s+", "", phrase).strip()
+        phrase = _ADD_CREATE_RE.sub("", phrase).strip()
         return "text", phrase
 
     if "button" in lowered:
-        label = re.sub(r"(?i)\bbutton\b", "", phrase).strip(" :,-")
+        label = _BUTTON_WORD_RE.sub("", phrase).strip(" :,-")
         return "button", label or phrase
 
     return "text", phrase
@@ -1259,6 +1472,30 @@ def _group_screens(phrases: list[str]) -> list[ScreenSpec]:
     return screens
 
 
+# Nominal component heights (px); anything else gets 80.
+_HEIGHT_BY_TYPE: dict[str, int] = {
+    "header": 60,
+    "tabs": 48,
+    "input": 52,
+    "button": 52,
+    "dropdown": 52,
+    "textarea": 120,
+    "checkbox": 40,
+    "radio": 40,
+    "toggle": 40,
+    "card": 140,
+    "list": 160,
+    "image": 160,
+    "footer": 80,
+}
+# Library components clamped to their nominal height (all are clamped to the content width).
+_FIT_HEIGHT_TYPES = frozenset(("header", "footer", "tabs", "card", "image", "input", "dropdown", "textarea"))
+# Library components centered horizontally within the content width.
+_CENTERED_TYPES = frozenset(("button", "tabs", "footer"))
+# Library components whose main label is rewritten to the requested text.
+_LABEL_REWRITE_TYPES = frozenset(("button", "header", "card"))
+
+
 def _layout_screen(
     *,
     builder: ExcalidrawBuilder,
@@ -1276,36 +1513,47 @@ def _layout_screen(
     margin = g
     gap = g
     pad = g
+    # The phrase loop below builds many elements; bind the builder API once.
+    snap = builder.snap
+    mk_rect = builder.rect
+    mk_text = builder.text
+    mk_line = builder.line
+    mk_labeled_rect = builder.labeled_rect
+    text_color = builder.theme.text
+    muted_color = builder.theme.muted_text
 
     elements: list[dict[str, Any]] = []
+    append = elements.append
+    extend = elements.extend
 
     # Screen boundary. Keep boundary transparent to avoid overwhelming the page.
-    boundary = builder.rect(
+    boundary = mk_rect(
         x=screen_x,
         y=screen_y,
         w=screen_w,
         h=screen_h,
         roundness=8,
         seer_label="screen",
+        outline=True,
     )
-    boundary["backgroundColor"] = "transparent"
-    boundary["fillStyle"] = "hachure"
-    elements.append(boundary)
+    append(boundary)
     if show_label:
-        label_y = max(0, screen_y - builder.grid)
-        elements.append(builder.text(x=screen_x, y=label_y, text=screen_name, font_size=12, color=builder.theme.muted_text))
+        label_y = max(0, screen_y - g)
+        append(mk_text(x=screen_x, y=label_y, text=screen_name, font_size=12, color=muted_color))
 
     content_x = screen_x + margin
     content_w = screen_w - margin * 2
     y = screen_y + margin
 
-    for phrase in phrases:
+    y_limit = screen_y + screen_h - margin
+    last_idx = len(phrases) - 1
+    for phrase_idx, phrase in enumerate(phrases):
         comp_type, value = _parse_component(phrase)
         if comp_type == "screen":
             continue
 
         if comp_type == "divider":
-            elements.append(builder.line(x=content_x, y=y, x2=content_x + content_w, y2=y))
+            append(mk_line(x=content_x, y=y, x2=content_x + content_w, y2=y))
             y += gap // 2
             continue
 
@@ -1325,20 +1573,20 @@ def _layout_screen(
                     )
                     _fit_group_to_bounds(builder, group, max_w=content_w, max_h=28)
                     _rewrite_library_section_title(builder, group, label)
-                    elements.extend(group)
+                    extend(group)
                     _, _, _, by1 = _bbox_for_elements(group)
-                    y = builder.snap(by1 + builder.grid)
+                    y = snap(by1 + g)
                     used = True
             if not used:
-                elements.append(builder.text(x=content_x + pad, y=y, text=label.upper(), font_size=12, color=builder.theme.muted_text))
-                y = builder.snap(y + builder.grid)
-            elements.append(builder.line(x=content_x, y=y, x2=content_x + content_w, y2=y))
-            y = builder.snap(y + builder.grid)
+                append(mk_text(x=content_x + pad, y=y, text=label.upper(), font_size=12, color=muted_color))
+                y = snap(y + g)
+            append(mk_line(x=content_x, y=y, x2=content_x + content_w, y2=y))
+            y = snap(y + g)
             continue
 
         if comp_type == "text":
             label = value or phrase
-            elements.append(builder.text(x=content_x, y=y, text=label, font_size=16, color=builder.theme.text))
+            append(mk_text(x=content_x, y=y, text=label, font_size=16, color=text_color))
             y += 32
             continue
 
@@ -1359,14 +1607,14 @@ def _layout_screen(
                             label_override=it_label,
                             seer_label="chips",
                         )
-                        elements.extend(group)
+                        extend(group)
                         gx0, gy0, gx1, gy1 = _bbox_for_elements(group)
-                        x_cursor = builder.snap(gx1 + builder.grid)
+                        x_cursor = snap(gx1 + g)
                         max_y1 = max(max_y1, gy1)
-                    y = builder.snap(max_y1 + gap)
+                    y = snap(max_y1 + gap)
                     continue
             # Fallback: simple inline list
-            elements.append(builder.text(x=content_x, y=y, text=", ".join(items) or "chips", font_size=16, color=builder.theme.muted_text))
+            append(mk_text(x=content_x, y=y, text=", ".join(items) or "chips", font_size=16, color=muted_color))
             y += 32
             continue
 
@@ -1388,37 +1636,22 @@ def _layout_screen(
                         label_override=label_override,
                         seer_label="lib",
                     )
-                    elements.extend(group)
+                    extend(group)
                     _, _, _, by1 = _bbox_for_elements(group)
-                    y = builder.snap(by1 + gap)
+                    y = snap(by1 + gap)
                     continue
             # Fallback: just render the request as text.
-            elements.append(builder.text(x=content_x, y=y, text=f"lib: {value}", font_size=16, color=builder.theme.muted_text))
+            append(mk_text(x=content_x, y=y, text=f"lib: {value}", font_size=16, color=muted_color))
             y += 32
             continue
 
-        height_by_type = {
-            "header": 60,
-            "tabs": 48,
-            "input": 52,
-            "button": 52,
-            "dropdown": 52,
-            "textarea": 120,
-            "checkbox": 40,
-            "radio": 40,
-            "toggle": 40,
-            "card": 140,
-            "list": 160,
-            "image": 160,
-            "footer": 80,
-        }
-        h = height_by_type.get(comp_type, 80)
+        h = _HEIGHT_BY_TYPE.get(comp_type, 80)
         label = (value or comp_type.title()).strip()
 
         if prefer_library and library and comp_type in DEFAULT_LIBRARY_COMPONENT_QUERIES:
             item = _pick_library_item_for_component(library, comp_type, label)
             if item:
-                x0, y0, x1, y1 = _bbox_for_elements(item.elements)
+                x0, y0, x1, y1 = item.bbox
                 item_w = x1 - x0
                 item_h = y1 - y0
                 place_x = content_x
@@ -1436,23 +1669,19 @@ def _layout_screen(
                 )
                 # Fit library components into the screen content width/height to avoid overlap across screens.
                 max_w = content_w
-                max_h = None
-                if comp_type in ("header", "footer", "tabs"):
-                    max_h = h
-                elif comp_type in ("card", "image"):
-                    max_h = h
-                elif comp_type in ("input", "dropdown"):
-                    max_h = h
-                elif comp_type == "textarea":
-                    max_h = h
-                _fit_group_to_bounds(builder, group, max_w=max_w, max_h=max_h)
+                max_h = h if comp_type in _FIT_HEIGHT_TYPES else None
+                # One bbox serves the fit, the vertical padding and the centering below; it is
+                # only rescanned after steps that actually reshape the group.
+                bbox = _bbox_for_elements(group)
+                if _fit_group_to_bounds(builder, group, max_w=max_w, max_h=max_h, bbox=bbox) != 1.0:
+                    bbox = _bbox_for_elements(group)
 
                 if comp_type == "header":
                     _simplify_library_header(group, keep_actions=False)
                     # If the library header has no background, add one for clarity and spacing.
                     has_rect = any(el.get("type") == "rectangle" for el in group)
                     if not has_rect:
-                        header_bg = builder.rect(
+                        header_bg = mk_rect(
                             x=content_x,
                             y=y,
                             w=content_w,
@@ -1462,124 +1691,123 @@ def _layout_screen(
                         )
                         _set_rect_bounds(header_bg, x=content_x, y=y, w=content_w, h=h)
                         group.insert(0, header_bg)
+                    bbox = _bbox_for_elements(group)
 
                 if max_h:
-                    gx0, gy0, gx1, gy1 = _bbox_for_elements(group)
+                    _, gy0, _, gy1 = bbox
                     group_h = gy1 - gy0
                     if group_h > 0 and max_h > group_h:
+                        # x is already whole pixels, so this only moves y; the x extent stays valid.
                         _offset_group(group, dy=(max_h - group_h) / 2)
 
                 _apply_theme_to_library_group(builder, group)
 
+                # Group membership is final from here on; index it once for the helpers below.
+                by_id = _group_index(group)
+
                 if comp_type == "input":
-                    _normalize_input_group(builder, group, x=content_x, y=y, w=content_w, h=h)
+                    _normalize_input_group(builder, group, x=content_x, y=y, w=content_w, h=h, by_id=by_id)
 
                 if comp_type == "card":
-                    _normalize_card_group(builder, group, x=content_x, y=y, w=content_w, h=h)
+                    _normalize_card_group(builder, group, x=content_x, y=y, w=content_w, h=h, by_id=by_id)
 
                 if comp_type == "header":
                     _normalize_header_group(builder, group, x=content_x, y=y, w=content_w, h=h)
 
-                if comp_type in ("button", "tabs", "footer"):
-                    gx0, _, gx1, _ = _bbox_for_elements(group)
+                if comp_type in _CENTERED_TYPES:
+                    # Theming leaves geometry alone and the input/card/header normalizers skip these types.
+                    gx0, _, gx1, _ = bbox
                     group_w = gx1 - gx0
                     if group_w > 0 and group_w < content_w:
                         _offset_group(group, dx=(content_w - group_w) / 2)
 
                 if comp_type == "tabs":
-                    tab_labels = [t.strip() for t in re.split(r"\s*\|\s*", label) if t.strip()]
-                    if len(tab_labels) <= 1:
-                        tab_labels = _split_items(label) or [label or "Tab"]
-                    _rewrite_library_tabs_labels(builder, group, tab_labels)
-                elif comp_type in ("button", "header", "card"):
+                    tab_labels = _split_labels(label) or [label or "Tab"]
+                    _rewrite_library_tabs_labels(builder, group, tab_labels, by_id=by_id)
+                elif comp_type in _LABEL_REWRITE_TYPES:
                     if label:
-                        _rewrite_library_label(builder, group, label)
+                        _rewrite_library_label(builder, group, label, by_id=by_id)
                 elif comp_type == "footer":
-                    footer_labels = [t.strip() for t in re.split(r"\s*\|\s*", label) if t.strip()]
-                    if len(footer_labels) <= 1:
-                        footer_labels = _split_items(label) or []
+                    footer_labels = _split_labels(label)
                     if footer_labels:
                         _rewrite_library_footer_labels(builder, group, footer_labels)
                 elif comp_type == "input":
-                    _rewrite_library_label_and_placeholder(builder, group, label="", placeholder=label or "Input")
+                    _rewrite_library_label_and_placeholder(builder, group, label="", placeholder=label or "Input", by_id=by_id)
                 elif comp_type in ("dropdown", "textarea"):
                     _rewrite_library_label_and_placeholder(
                         builder,
                         group,
                         label=label,
                         placeholder="Select…" if comp_type == "dropdown" else "Enter text…",
+                        by_id=by_id,
                     )
                 elif comp_type in ("checkbox", "radio", "toggle"):
                     # Strip simple state hints from the label.
-                    cleaned = re.sub(r"\((on|off|true|false|enabled|disabled|checked|unchecked)\)", "", label, flags=re.I).strip()
-                    cleaned = re.sub(r"\b(on|off|true|false|enabled|disabled|checked|unchecked)\b", "", cleaned, flags=re.I).strip()
+                    cleaned = _STATE_PAREN_RE.sub("", label).strip()
+                    cleaned = _STATE_WORD_RE.sub("", cleaned).strip()
                     if cleaned:
-                        _rewrite_library_label(builder, group, cleaned)
-                elements.extend(group)
+                        _rewrite_library_label(builder, group, cleaned, by_id=by_id)
+                extend(group)
                 gx0, gy0, gx1, gy1 = _bbox_for_elements(group)
-                y = builder.snap(gy1 + gap)
+                y = snap(gy1 + gap)
                 continue
 
         if comp_type == "header":
-            rect, txt = builder.labeled_rect(x=content_x, y=y, w=content_w, h=h, text=label, font_size=18, roundness=8, seer_label="header")
-            elements.extend([rect, txt])
+            rect, txt = mk_labeled_rect(x=content_x, y=y, w=content_w, h=h, text=label, font_size=18, roundness=8, seer_label="header")
+            extend((rect, txt))
         elif comp_type == "button":
-            rect, txt = builder.labeled_rect(x=content_x, y=y, w=min(content_w, 320), h=h, text=label, font_size=18, roundness=6, seer_label="button")
-            elements.extend([rect, txt])
+            rect, txt = mk_labeled_rect(x=content_x, y=y, w=min(content_w, 320), h=h, text=label, font_size=18, roundness=6, seer_label="button")
+            extend((rect, txt))
         elif comp_type == "tabs":
             # Render segmented tabs: `tabs: A | B | C`
-            tab_labels = [t.strip() for t in re.split(r"\s*\|\s*", label) if t.strip()]
-            if len(tab_labels) <= 1:
-                tab_labels = _split_items(label) or [label or "Tab"]
-            rect = builder.rect(x=content_x, y=y, w=content_w, h=h, roundness=6, seer_label="tabs")
-            rect["backgroundColor"] = "transparent"
-            rect["fillStyle"] = "hachure"
-            elements.append(rect)
+            tab_labels = _split_labels(label) or [label or "Tab"]
+            rect = mk_rect(x=content_x, y=y, w=content_w, h=h, roundness=6, seer_label="tabs", outline=True)
+            append(rect)
             n = max(1, min(6, len(tab_labels)))
             seg_w = float(content_w) / n
-            for i in range(n):
+            label_h = _round_to(14 * 1.6, 10)
+            ty = y + (h - label_h) / 2
+            # Separators and labels stay interleaved: element order (and id/seed draws) is part of the output.
+            for i, t in enumerate(tab_labels[:n]):
+                seg_x = content_x + seg_w * i
                 if i > 0:
-                    x_sep = content_x + seg_w * i
-                    elements.append(builder.line(x=x_sep, y=y, x2=x_sep, y2=y + h))
-                t = tab_labels[i]
+                    append(mk_line(x=seg_x, y=y, x2=seg_x, y2=y + h))
                 label_w = _calc_label_width(t, 14)
-                label_h = _round_to(14 * 1.6, 10)
-                tx = content_x + seg_w * i + (seg_w - label_w) / 2
-                ty = y + (h - label_h) / 2
-                elements.append(builder.text(x=tx, y=ty, text=t, font_size=14, color=builder.theme.text, align="center", valign="middle", width=label_w, height=label_h))
+                tx = seg_x + (seg_w - label_w) / 2
+                append(mk_text(x=tx, y=ty, text=t, font_size=14, color=text_color, align="center", valign="middle", width=label_w, height=label_h))
         elif comp_type == "input":
-            rect, txt = builder.labeled_rect(
+            rect, txt = mk_labeled_rect(
                 x=content_x, y=y, w=min(content_w, 520), h=h, text=label or "Input", font_size=16, roundness=6, seer_label="input"
             )
-            txt["strokeColor"] = builder.theme.muted_text
-            elements.extend([rect, txt])
+            txt["strokeColor"] = muted_color
+            extend((rect, txt))
         elif comp_type == "image":
-            rect = builder.rect(x=content_x, y=y, w=content_w, h=h, roundness=8, seer_label="image")
+            rect = mk_rect(x=content_x, y=y, w=content_w, h=h, roundness=8, seer_label="image")
             rect["fillStyle"] = "cross-hatch"
-            elements.append(rect)
-            elements.append(builder.text(x=content_x + pad, y=y + pad, text=label or "Image", font_size=16, color=builder.theme.muted_text))
+            append(rect)
+            append(mk_text(x=content_x + pad, y=y + pad, text=label or "Image", font_size=16, color=muted_color))
         elif comp_type == "list":
             items = _split_items(label)
-            row_h = max(builder.grid * 2, 32)
-            list_h = builder.grid * 2 + row_h * max(1, len(items))
-            rect = builder.rect(x=content_x, y=y, w=content_w, h=list_h, roundness=8, seer_label="list")
+            row_h = max(g * 2, 32)
+            list_h = g * 2 + row_h * max(1, len(items))
+            rect = mk_rect(x=content_x, y=y, w=content_w, h=list_h, roundness=8, seer_label="list")
             _set_rect_bounds(rect, x=content_x, y=y, w=content_w, h=list_h)
-            elements.append(rect)
-            row_y = y + builder.grid
+            append(rect)
+            row_y = y + g
+            font_size = 14
+            baseline = int(font_size * 1.2)
             for idx, item in enumerate(items[:7]):
                 if idx > 0:
-                    elements.append(builder.line(x=content_x + 8, y=row_y, x2=content_x + content_w - 8, y2=row_y))
-                font_size = 14
+                    append(mk_line(x=content_x + 8, y=row_y, x2=content_x + content_w - 8, y2=row_y))
                 t_w, t_h = _text_size(item, font_size)
-                baseline = int(font_size * 1.2)
                 text_y = row_y + (row_h / 2) - baseline
-                elements.append(
-                    builder.text(
+                append(
+                    mk_text(
                         x=content_x + pad,
                         y=text_y,
                         text=item,
                         font_size=font_size,
-                        color=builder.theme.text,
+                        color=text_color,
                         width=t_w,
                         height=t_h,
                     )
@@ -1587,12 +1815,14 @@ def _layout_screen(
                 row_y += row_h
             h = list_h
         else:
-            rect, txt = builder.labeled_rect(x=content_x, y=y, w=content_w, h=h, text=label, font_size=16, roundness=8, seer_label=comp_type)
-            elements.extend([rect, txt])
+            rect, txt = mk_labeled_rect(x=content_x, y=y, w=content_w, h=h, text=label, font_size=16, roundness=8, seer_label=comp_type)
+            extend((rect, txt))
 
         y += h + gap
-        if y > screen_y + screen_h - margin:
-            elements.append(builder.text(x=content_x, y=screen_y + screen_h - margin, text="(more omitted…)", font_size=14, color=builder.theme.muted_text))
+        if y > y_limit:
+            # Only flag truncation when phrases are actually left over.
+            if phrase_idx < last_idx:
+                append(mk_text(x=content_x, y=y_limit, text="(more omitted…)", font_size=14, color=muted_color))
             break
 
     return elements
@@ -1600,7 +1830,19 @@ def _layout_screen(
 
 def _validate_scene(scene: dict[str, Any], *, grid: int) -> None:
     elements = scene.get("elements") or []
+
+    def _is_on_grid(value: Any) -> bool:
+        try:
+            v = float(value)
+        except Exception:
+            return True
+        return abs(v - round(v / grid) * grid) < 1e-6
+
+    # One pass for ids, grid snapping and collecting bound texts. Grid errors are held
+    # back so id and binding errors are still reported first.
     by_id: dict[str, dict[str, Any]] = {}
+    bound_texts: list[dict[str, Any]] = []
+    off_grid: tuple[str, str, Any] | None = None
     for el in elements:
         elid = el.get("id")
         if not isinstance(elid, str) or not elid:
@@ -1610,37 +1852,46 @@ def _validate_scene(scene: dict[str, Any], *, grid: int) -> None:
         if el.get("isDeleted") is True:
             raise ValueError(f"isDeleted element present: {elid}")
         by_id[elid] = el
-
-    # Container/text binding invariants.
-    for el in elements:
-        if el.get("type") != "text":
+        if el.get("type") == "text" and el.get("containerId"):
+            bound_texts.append(el)
+        if off_grid is not None:
             continue
-        container_id = el.get("containerId")
-        if not container_id:
+        custom = el.get("customData")
+        if type(custom) is dict and custom.get("seerSource") == "library":
             continue
+        for key in ("x", "y"):
+            v = el.get(key)
+            # Builder coordinates are floats; check those inline and leave odd values to _is_on_grid.
+            if type(v) is float:
+                if abs(v - round(v / grid) * grid) < 1e-6:
+                    continue
+            elif key not in el or _is_on_grid(v):
+                continue
+            off_grid = (elid, key, v)
+            break
+
+    # Container/text binding invariants. Each container's bound text ids are collected
+    # once, so texts sharing a container don't rescan its boundElements.
+    bound_text_ids: dict[str, set[str]] = {}
+    for el in bound_texts:
+        container_id = el["containerId"]
         container = by_id.get(container_id)
         if not container:
             raise ValueError(f"text {el['id']} references missing containerId {container_id}")
         if (el.get("groupIds") or []) != (container.get("groupIds") or []):
             raise ValueError(f"text/container groupIds mismatch for {el['id']} -> {container_id}")
-        bound = container.get("boundElements") or []
-        if not any((b.get("type") == "text" and b.get("id") == el["id"]) for b in bound if isinstance(b, dict)):
+        text_ids = bound_text_ids.get(container_id)
+        if text_ids is None:
+            bound = container.get("boundElements") or []
+            text_ids = bound_text_ids[container_id] = {
+                b["id"] for b in bound if isinstance(b, dict) and b.get("type") == "text" and isinstance(b.get("id"), str)
+            }
+        if el["id"] not in text_ids:
             raise ValueError(f"container {container_id} missing boundElements reference to text {el['id']}")
 
-    def _is_on_grid(value: Any) -> bool:
-        try:
-            v = float(value)
-        except Exception:
-            return True
-        return abs(v - round(v / grid) * grid) < 1e-6
-
-    for el in elements:
-        custom = el.get("customData")
-        if isinstance(custom, dict) and custom.get("seerSource") == "library":
-            continue
-        for key in ("x", "y"):
-            if key in el and not _is_on_grid(el[key]):
-                raise ValueError(f"element {el['id']} not snapped to grid ({key}={el[key]})")
+    if off_grid is not None:
+        elid, key, v = off_grid
+        raise ValueError(f"element {elid} not snapped to grid ({key}={v})")
 
 
 def build_scene(
@@ -1715,17 +1966,13 @@ def build_scene(
     if strict:
         _validate_scene(scene, grid=preset.grid_size)
 
-    library_used_total = 0
-    library_used_by_label: dict[str, int] = {}
-    for el in elements:
-        custom = el.get("customData")
-        if not isinstance(custom, dict):
-            continue
-        if custom.get("seerSource") != "library":
-            continue
-        library_used_total += 1
-        label = str(custom.get("seerLabel") or "unknown")
-        library_used_by_label[label] = library_used_by_label.get(label, 0) + 1
+    library_labels = [
+        str(custom.get("seerLabel") or "unknown")
+        for el in elements
+        if isinstance(custom := el.get("customData"), dict) and custom.get("seerSource") == "library"
+    ]
+    library_used_total = len(library_labels)
+    library_used_by_label: dict[str, int] = dict(Counter(library_labels))
 
     meta = {
         "preset": preset.name,
@@ -1751,7 +1998,40 @@ def build_scene(
     return scene, meta
 
 
-def main(argv: list[str]) -> int:
+def _serialize_scene(scene: dict[str, Any]) -> bytes:
+    # Serialized once and written to both the run file and latest-*.
+    if orjson is not None:
+        try:
+            return orjson.dumps(scene, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            # e.g. ints beyond 64 bits; stdlib json handles anything it can.
+            pass
+    return (json.dumps(scene, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _write_latest(latest_path: str, out_path: str, payload: bytes) -> None:
+    # latest-* must stay an independent copy (it gets opened and edited), so no hard link.
+    # Where the filesystem supports it, share the run file's extents instead of
+    # writing the same bytes a second time. FICLONE's request number is Linux-only.
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(out_path, "rb") as src, open(latest_path, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return
+        except OSError:
+            pass
+    # copyfile uses the kernel fast paths (fcopyfile on macOS, sendfile on Linux).
+    try:
+        shutil.copyfile(out_path, latest_path)
+        return
+    except OSError:
+        pass
+    Path(latest_path).write_bytes(payload)
+
+
+@lru_cache(maxsize=1)
+def _get_parser() -> argparse.ArgumentParser:
+    # Built once per process; in-process suite runs call main() repeatedly.
     parser = argparse.ArgumentParser(description="Generate a .excalidraw file from natural-language-ish text.")
     parser.add_argument("--text", help="Prompt text. If omitted, reads stdin.")
     parser.add_argument("--spec", help="Path to a text file prompt (alternative to --text).")
@@ -1769,7 +2049,13 @@ def main(argv: list[str]) -> int:
     parser.add_argument("--name", default="wireframe", help="Slug used for default output name.")
     parser.add_argument("--out", help="Output .excalidraw path. If omitted, writes under .seer/excalidraw/.")
     parser.add_argument("--json", action="store_true", help="Print metadata JSON to stdout (suppresses path output).")
-    args = parser.parse_args(argv)
+    return parser
+
+
+def main(argv: list[str], *, out_root: str | None = None, meta_out: dict[str, Any] | None = None) -> int:
+    # For in-process callers (generate_wireframe_suite.py): out_root overrides $SEER_OUT_DIR,
+    # and meta_out receives the metadata dict instead of it being printed.
+    args = _get_parser().parse_args(argv)
 
     if args.text and args.spec:
         print("error: pass only one of --text or --spec", file=sys.stderr)
@@ -1802,9 +2088,12 @@ def main(argv: list[str]) -> int:
     else:
         size = _infer_size(text)
 
-    out_root = os.environ.get("SEER_OUT_DIR") or os.environ.get("SEER_TMP_DIR") or ".seer"
-    ts = time.strftime("%Y%m%d-%H%M%S")
-    run_id = f"{ts}-{os.getpid()}-{random.randint(0, 99999)}"
+    out_root = out_root or _OUT_ROOT
+    # The sub-second microseconds stand in for a random suffix: distinct per run
+    # without touching the global Mersenne Twister.
+    now_ns = time.time_ns()
+    ts = time.strftime("%Y%m%d-%H%M%S", time.localtime(now_ns // 1_000_000_000))
+    run_id = f"{ts}-{os.getpid()}-{now_ns // 1000 % 1_000_000:06d}"
     slug = _slugify(args.name)
 
     out_path = args.out or os.path.join(_default_excalidraw_output_dir(out_root), f"nl-{slug}-{run_id}.excalidraw")
@@ -1847,17 +2136,14 @@ def main(argv: list[str]) -> int:
         library=library,
         prefer_library=prefer_library,
     )
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(scene, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    payload = _serialize_scene(scene)
+    Path(out_path).write_bytes(payload)
 
     latest_dir = os.path.join(out_root, "excalidraw")
     os.makedirs(latest_dir, exist_ok=True)
     latest_path = os.path.join(latest_dir, f"latest-{slug}.excalidraw")
     try:
-        with open(latest_path, "w", encoding="utf-8") as f:
-            json.dump(scene, f, indent=2, ensure_ascii=False)
-            f.write("\n")
+        _write_latest(latest_path, out_path, payload)
     except Exception:
         pass
 
@@ -1876,7 +2162,9 @@ def main(argv: list[str]) -> int:
         "latest_path": os.path.abspath(latest_path),
     }
 
-    if args.json:
+    if meta_out is not None:
+        meta_out.update(meta)
+    elif args.json:
         print(json.dumps(meta))
     else:
         print(out_path)
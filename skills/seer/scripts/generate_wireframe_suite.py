@@ -2,15 +2,24 @@
 from __future__ import annotations
 
 import argparse
+import io
 import json
 import os
 import re
-import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from types import ModuleType
 from typing import Any
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 
 @dataclass(frozen=True)
 class SuiteCase:
@@ -26,9 +35,22 @@ def _excalidraw_generator() -> Path:
     return _script_dir() / "excalidraw_from_text.py"
 
 
+def _load_generator() -> ModuleType:
+    # Imported rather than exec'd per case: one interpreter start and one library parse
+    # per worker instead of per case.
+    script_dir = str(_script_dir())
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    import excalidraw_from_text
+
+    return excalidraw_from_text
+
+
+_OUT_ROOT = os.environ.get("SEER_OUT_DIR") or os.environ.get("SEER_TMP_DIR") or ".seer"
+
+
 def _default_out_dir() -> Path:
-    out_root = os.environ.get("SEER_OUT_DIR") or os.environ.get("SEER_TMP_DIR") or ".seer"
-    return Path(out_root) / "excalidraw"
+    return Path(_OUT_ROOT) / "excalidraw"
 
 
 def _suite_cases() -> list[SuiteCase]:
@@ -149,34 +171,49 @@ screen: Library sanity
 
 
 def _run_case(
-    *,
-    generator: Path,
     case: SuiteCase,
+    *,
     theme: str,
     fidelity: str,
     preset: str | None,
     out_dir: Path,
-    extra_env: dict[str, str],
 ) -> dict[str, Any]:
-    cmd = [sys.executable, str(generator), "--name", case.name, "--json", "--theme", theme, "--fidelity", fidelity]
+    generator = _load_generator()
+    # --text=... keeps a prompt starting with "-" from being parsed as an option.
+    argv = [f"--text={case.prompt}", "--name", case.name, "--theme", theme, "--fidelity", fidelity]
     if preset:
-        cmd.extend(["--preset", preset])
-    p = subprocess.run(
-        cmd,
-        input=case.prompt.encode("utf-8"),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        env={**os.environ, **extra_env, "SEER_OUT_DIR": str(out_dir.parent)},
-    )
-    if p.returncode != 0:
-        raise RuntimeError(
-            f"case {case.name} failed (exit {p.returncode})\n"
-            f"stderr:\n{p.stderr.decode('utf-8', errors='replace')}\n"
-        )
-    try:
-        return json.loads(p.stdout.decode("utf-8"))
-    except Exception as e:
-        raise RuntimeError(f"case {case.name} returned non-JSON output: {e}\n{p.stdout!r}") from e
+        argv.extend(["--preset", preset])
+    meta: dict[str, Any] = {}
+    out = io.StringIO()
+    err = io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            code = generator.main(argv, out_root=str(out_dir.parent), meta_out=meta)
+        except SystemExit as e:
+            # argparse rejects bad options by exiting, as it would in a child process.
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            # e.g. ValueError from strict scene validation.
+            raise RuntimeError(f"case {case.name} failed ({type(e).__name__}: {e})\nstderr:\n{err.getvalue()}\n") from e
+    if code != 0:
+        raise RuntimeError(f"case {case.name} failed (exit {code})\nstderr:\n{err.getvalue()}\n")
+    return meta
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2) + "\n").encode("utf-8")
+
+
+def _summarize(case: SuiteCase, meta: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "name": case.name,
+        "output_path": meta.get("output_path"),
+        "latest_path": meta.get("latest_path"),
+        "library_used": meta.get("library_used"),
+        "screens": meta.get("screens"),
+    }
 
 
 def main(argv: list[str]) -> int:
@@ -187,6 +224,7 @@ def main(argv: list[str]) -> int:
     parser.add_argument("--preset", default=None, choices=["mobile", "tablet", "desktop"], help="Preset passed to excalidraw_from_text.py")
     parser.add_argument("--filter", default=None, help="Only run cases whose name matches this regex")
     parser.add_argument("--manifest", default=None, help="Write a JSON manifest of outputs to this file")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for cases (default: CPU count; 1 runs in-process)")
     args = parser.parse_args(argv)
 
     generator = _excalidraw_generator()
@@ -205,31 +243,33 @@ def main(argv: list[str]) -> int:
             print(f"error: no suite cases matched filter: {args.filter}", file=sys.stderr)
             return 2
 
-    results: list[dict[str, Any]] = []
-    for case in cases:
-        meta = _run_case(
-            generator=generator,
-            case=case,
-            theme=args.theme,
-            fidelity=args.fidelity,
-            preset=args.preset,
-            out_dir=out_dir,
-            extra_env={},
-        )
-        results.append(
-            {
-                "name": case.name,
-                "output_path": meta.get("output_path"),
-                "latest_path": meta.get("latest_path"),
-                "library_used": meta.get("library_used"),
-                "screens": meta.get("screens"),
-            }
-        )
+    run = partial(_run_case, theme=args.theme, fidelity=args.fidelity, preset=args.preset, out_dir=out_dir)
+
+    # The generator keeps per-scene module state, so cases run in separate worker
+    # processes (each reused for several cases), or sequentially in this one.
+    # map() yields in case order, keeping the manifest deterministic.
+    jobs = max(1, min(len(cases), args.jobs or os.cpu_count() or 1))
+    if jobs == 1:
+        results = [_summarize(case, run(case)) for case in cases]
+    else:
+        # Workers import the generator up front and hand meta dicts back directly.
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_load_generator) as pool:
+            # pool.map submits every case up front and yields lazily, so earlier
+            # results are summarized while later cases are still running.
+            results = [_summarize(case, meta) for case, meta in zip(cases, pool.map(run, cases))]
 
     manifest_path = Path(args.manifest).expanduser() if args.manifest else (out_dir / "suite-manifest.json")
-    manifest_path.write_text(json.dumps({"generated": results}, indent=2), encoding="utf-8")
+    manifest_path.write_bytes(_dumps({"generated": results}))
 
-    print(json.dumps({"count": len(results), "manifest": str(manifest_path), "cases": results}, indent=2))
+    summary = _dumps({"count": len(results), "manifest": str(manifest_path), "cases": results})
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        # Text-only streams, e.g. redirect_stdout(io.StringIO()).
+        sys.stdout.write(summary.decode("utf-8"))
+    else:
+        sys.stdout.flush()
+        buffer.write(summary)
+        buffer.flush()
     return 0
 
 
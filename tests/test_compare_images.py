@@ -0,0 +1,40 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "skills" / "seer" / "scripts"))
+
+import compare_images  # noqa: E402
+from PIL import Image  # noqa: E402
+
+# Luma of each pixel under Pillow's fixed-point convert("L") weights.
+PIXELS = [(0, 0, 0), (255, 255, 255), (10, 20, 30), (200, 100, 50)]
+EXPECTED_GRAY = [0, 255, 18, 124]
+
+
+def _diff_image() -> Image.Image:
+    img = Image.new("RGB", (len(PIXELS), 1))
+    img.putdata(PIXELS)
+    return img
+
+
+class DiffStatsTest(unittest.TestCase):
+    def test_fixed_stats(self):
+        gray, total, changed, avg = compare_images.diff_stats(_diff_image())
+        gray_values = list(gray.ravel()) if compare_images.np is not None else list(gray.getdata())
+        self.assertEqual([int(v) for v in gray_values], EXPECTED_GRAY)
+        self.assertEqual(total, 4)
+        self.assertEqual(changed, 3)
+        self.assertAlmostEqual(avg, sum(EXPECTED_GRAY) / (255 * 4))
+
+    def test_matches_pillow_luma(self):
+        img = Image.new("RGB", (64, 64))
+        img.putdata([((i * 7) % 256, (i * 13) % 256, (i * 29) % 256) for i in range(64 * 64)])
+        gray, _, _, _ = compare_images.diff_stats(img)
+        expected = list(img.convert("L").getdata())
+        gray_values = list(gray.ravel()) if compare_images.np is not None else list(gray.getdata())
+        self.assertEqual([int(v) for v in gray_values], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()